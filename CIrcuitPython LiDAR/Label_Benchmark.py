@@ -0,0 +1,86 @@
+"""
+Microbenchmark for bitmap_label text rendering, run it on the Pico from the REPL:
+    import Label_Benchmark
+
+Renders the same strings with Label._place_text for a range of text lengths
+and reports milliseconds per render for each glyph copy path.
+
+  blit   : displayio.Bitmap.blit, the native copy used when the target has it
+  before : old Python fallback, bounds checks and a skip test on every pixel
+  after  : new Python fallback, clipped once, copied row by row, transparent
+           spans skipped
+
+The fallback paths are forced by wrapping the target in NO_BLIT_BITMAP, which
+only offers width, height and flat pixel indexing, like builds without blit.
+"""
+import time
+import displayio
+import terminalio
+from adafruit_display_text import bitmap_label
+
+RUNS = 20
+LENGTHS = (4, 16, 64)
+
+
+class NO_BLIT_BITMAP:
+    # stands in for a bitmap without blit(), forwards flat index access
+
+    def __init__(self, bitmap):
+        self.bitmap = bitmap
+        self.width = bitmap.width
+        self.height = bitmap.height
+
+    def __getitem__(self, index):
+        return self.bitmap[index]
+
+    def __setitem__(self, index, value):
+        self.bitmap[index] = value
+
+
+def legacy_blit(bitmap, x, y, source_bitmap, x_1=0, y_1=0, x_2=None, y_2=None, skip_index=None):
+    # the Label._blit fallback before the row copy
+    if x_2 is None:
+        x_2 = source_bitmap.width
+    if y_2 is None:
+        y_2 = source_bitmap.height
+    if x_1 > x_2:
+        x_1, x_2 = x_2, x_1
+    if y_1 > y_2:
+        y_1, y_2 = y_2, y_1
+    x_2 = min(x_2, source_bitmap.width)
+    y_2 = min(y_2, source_bitmap.height)
+    for y_count in range(y_2 - y_1):
+        for x_count in range(x_2 - x_1):
+            x_placement = x + x_count
+            y_placement = y + y_count
+            if (bitmap.width > x_placement >= 0) and (bitmap.height > y_placement >= 0):
+                this_pixel_color = source_bitmap[y_1 + (y_count * source_bitmap.width) + x_1 + x_count]
+                if (skip_index is None) or (this_pixel_color != skip_index):
+                    bitmap[y_placement * bitmap.width + x_placement] = this_pixel_color
+            elif y_placement > bitmap.height:
+                break
+
+
+def run(name, label, target, text, baseline):
+    start = time.monotonic_ns()
+    for _ in range(RUNS):
+        label._place_text(target, text, terminalio.FONT, 0, baseline)
+    elapsed = time.monotonic_ns() - start
+    print("{:7s} {:3d} chars {:8.2f} ms/label".format(name, len(text), elapsed / RUNS / 1000000))
+
+
+label = bitmap_label.Label(terminalio.FONT, text=" ")
+fallback_blit = label._blit
+box_width, box_height, box_x, box_y = terminalio.FONT.get_bounding_box()
+baseline = box_height + box_y
+
+print("Label render benchmark, {} renders per case".format(RUNS))
+for length in LENGTHS:
+    text = ("Ang:180 D:0245 " * (length // 15 + 1))[:length]
+    bitmap = displayio.Bitmap(box_width * length, box_height, 2)
+    label._blit = fallback_blit
+    run("blit", label, bitmap, text, baseline)
+    label._blit = legacy_blit
+    run("before", label, NO_BLIT_BITMAP(bitmap), text, baseline)
+    label._blit = fallback_blit
+    run("after", label, NO_BLIT_BITMAP(bitmap), text, baseline)
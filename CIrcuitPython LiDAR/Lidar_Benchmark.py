@@ -0,0 +1,96 @@
+"""
+Microbenchmark for the LiDAR frame decode path, run it on the Pico from the REPL:
+    import Lidar_Benchmark
+
+A loopback UART serves a synthetic stream of valid frames so the numbers show
+decode cost rather than the sensor's output rate. Each mode runs for a fixed
+time and reports frames decoded per second and GC collections per second.
+
+  before : old getLidarDistance, bytearray() += UART.read(9) and byte indexing
+  after  : LIDAR_PARSER.readinto(), preallocated buffer and output arrays
+  filter : RANGE_FILTER.update() alone, median-of-5 + EMA per sample
+
+CircuitPython has no GC counter, so a collection is counted whenever
+gc.mem_free() goes up between two iterations (it only grows after a collection).
+"""
+import gc
+import time
+from Lidar_Parser import LIDAR_PARSER
+from Lidar_Filter import RANGE_FILTER
+
+RUN_SECS = 5
+FRAMES_PER_READ = 8
+
+
+def make_frame(distance, strength, temp_raw):
+    frame = bytearray([0x59, 0x59, distance & 0xFF, distance >> 8, strength & 0xFF, strength >> 8, temp_raw & 0xFF, temp_raw >> 8, 0])
+    frame[8] = sum(frame[0:8]) & 0xFF
+    return bytes(frame)
+
+
+class LOOPBACK_UART:
+    # stands in for busio.UART, always has FRAMES_PER_READ frames waiting
+
+    def __init__(self):
+        self.frame = make_frame(245, 1200, 2100)
+        self.chunk = self.frame * FRAMES_PER_READ
+        self.in_waiting = len(self.chunk)
+
+    def read(self, nbytes):
+        # busio.UART.read() returns a fresh bytes object on every call
+        return bytes(self.frame)
+
+    def readinto(self, buf):
+        buf[0:FRAMES_PER_READ * 9] = self.chunk
+        return len(self.chunk)
+
+    def reset_input_buffer(self):
+        pass
+
+
+def legacy_decode(uart):
+    # the decode path from getLidarDistance/getLidarData before LIDAR_PARSER
+    bin_ascii = bytearray()
+    if uart.in_waiting > 0:
+        bin_ascii += uart.read(9)
+        if bin_ascii[0] == 0x59 and bin_ascii[1] == 0x59:
+            distance   = bin_ascii[2] + bin_ascii[3] * 256
+            strength    = bin_ascii[4] + bin_ascii[5] * 256
+            temperature= (bin_ascii[6] + bin_ascii[7]* 256)/8-256
+            uart.reset_input_buffer()
+            return 1
+    uart.reset_input_buffer()
+    return 0
+
+
+def run(name, step):
+    gc.collect()
+    frames = 0
+    collections = 0
+    last_free = gc.mem_free()
+    start = time.monotonic()
+    while time.monotonic() - start < RUN_SECS:
+        frames += step()
+        free = gc.mem_free()
+        if free > last_free:
+            collections += 1
+        last_free = free
+    elapsed = time.monotonic() - start
+    print("{:7s} {:8.0f} frames/s {:8.1f} us/frame {:6.1f} gc/s".format(name, frames / elapsed, elapsed * 1000000 / frames, collections / elapsed))
+
+
+def filter_step(range_filter, samples):
+    for distance in samples:
+        range_filter.update(distance)
+    return len(samples)
+
+
+uart = LOOPBACK_UART()
+parser = LIDAR_PARSER()
+range_filter = RANGE_FILTER()
+samples = (245, 247, 1200, 246, 244, 248, 30, 245)   # a couple of spikes for the median to reject
+
+print("LiDAR decode benchmark, {} s per mode".format(RUN_SECS))
+run("before", lambda: legacy_decode(uart))
+run("after", lambda: parser.readinto(uart))
+run("filter", lambda: filter_step(range_filter, samples))
@@ -3,10 +3,15 @@ import busio
 import board
 import time
 from binascii import hexlify
+from Lidar_Parser import LIDAR_PARSER
+from Lidar_Command import LIDAR_COMMAND, ID_SAMPLE_FREQ, ID_SAVE_SETTINGS, ID_FULL_VERSION
 
 #lidar = UART(0, baudrate=115200, tx=Pin(16), rx=Pin(17))    #Define receiving interface of Lidar
 #lidar = UART(0, baudrate=115200, tx=Pin(12), rx=Pin(13))    #Define receiving interface of Lidar UART0
-lidar = busio.UART(tx=board.GP12, rx=board.GP13, baudrate=115200)    #Define receiving interface of Lidar UART0
+lidar = busio.UART(tx=board.GP12, rx=board.GP13, baudrate=115200, timeout=0)    #Define receiving interface of Lidar UART0, non-blocking reads
+
+parser = LIDAR_PARSER()
+command = LIDAR_COMMAND(lidar, parser)
 
 print(lidar)
 
@@ -30,87 +35,57 @@ frame_rate = 15 # default at 20Hz (best tested at 115200)
 
 def save_settings():
     print("\nSaving setting...")
-    info_packet = [0x5a,0x04,0x11,0x6F]
-    lidar.write(bytes(info_packet))
-    time.sleep(.0001)
+    status = command.request(ID_SAVE_SETTINGS)
+    if status is None or status[0] != 0:
+        print("Saving settings failed")
     
 def set_samp_rate(samp_rate=frame_rate):
     # change the sample rate
     global frame_rate
     print("Setting sample rate to {} Hz".format(samp_rate))
     samp_rate = int(samp_rate)
-    frame_rate = samp_rate
-    hex_rate = samp_rate.to_bytes(2,'big')
-    print("hex_rate:{}".format(hex_rate)) # \xHH\xLL => hex_rate[0]=\xHH hex_rate[1]=\xLL 
-    samp_rate_packet = [0x5a,0x06,0x03,hex_rate[1],hex_rate[0],00,00] # sample rate byte array
-    for i in range(len(samp_rate_packet)):
-        print(hex(samp_rate_packet[i]), end=" ")
-    lidar.write(bytes(samp_rate_packet)) # send sample rate instruction
-    time.sleep(0.001) # wait for change to take effect
+    echo = command.request(ID_SAMPLE_FREQ, samp_rate.to_bytes(2,'little')) # the sensor echoes the rate it actually applied
+    if echo is None:
+        print("No response, sample rate stays at {} Hz".format(frame_rate))
+        return
+    frame_rate = echo[0] | (echo[1] << 8)
     save_settings()
     return
-# 
+
 def get_version(UART0):
     # get version info | source: https://makersportal.com/blog/distance-detection-with-the-tf-luna-lidar-and-raspberry-pi
-    info_packet = [0x5a,0x04,0x14,0x00]
-    lidar.write(bytes(info_packet))
-    start_tick = time.time()
-    while (time.time()-start_tick < 10):
-#         print('.',end = '')
-#         utime.sleep_ms(1)
-        bin_ascii = bytearray()
-        #if UART0.any() > 0:
-        if UART0.in_waiting > 0:
-            bin_ascii += UART0.read(30) # known 30 bytes-length response
-            if bin_ascii[0] == 0x5a:
-                hex_stream = hexlify(bin_ascii,' ').decode('utf-8')
-                hex_array = hex_stream.split(" ")
-                print(hex_stream) # uncomment this to see the HEX data
-                print("{}".format(bin_ascii.decode('utf-8')))
-                version = bin_ascii[0:].decode('utf-8')
-                lst = []
-                for c in version:
-                    lst.append(c)
-                
-                for i in range(len(hex_array)):
-                    print("0x{} : ascii -> {}".format(hex_array[i],lst[i]))
-                print('\nVersion -'+version+'\n')
-                return
-            else:
-                lidar.write(bytes(info_packet))
-    print("Failed to retrieve version. This is a bit of a hit or miss kind of thing...")
+    version = command.request(ID_FULL_VERSION) # known 30 bytes-length response
+    if version is None:
+        print("Failed to retrieve version.")
+        return
+    print(hexlify(version,' ').decode('utf-8')) # raw HEX of the version string
+    version = version.decode('utf-8')
+    print('\nVersion -'+version+'\n')
 #
+def getLidarFrames(UART0):
+    # decode everything waiting on the UART, returns n with frames in parser.distance/strength/temp_raw[0:n]
+    if UART0.in_waiting > 0:
+        return parser.readinto(UART0)
+    return 0
+
 def getLidarDistance(UART0):
-    bin_ascii = bytearray()
-    if UART0.in_waiting >0:
-        bin_ascii += UART0.read(9)
-        
-        if bin_ascii[0] == 0x59 and bin_ascii[1] == 0x59:
-            distance = bin_ascii[2] + bin_ascii[3] *256
-        UART0.reset_input_buffer()
+    distance = 0
+    n = getLidarFrames(UART0)
+    if n:
+        distance = parser.distance[n-1]
     return distance
 
 def getLidarData(UART0):
-    
-    bin_ascii = bytearray()
-
-    if UART0.in_waiting > 0:
-        bin_ascii += UART0.read(9) # byte [0-8] = 9 bytes
-        #hex_stream = hexlify(bin_ascii,' ').decode()
-        #print(hex_stream[0:26]) # uncomment this to see the HEX data
-
-        if bin_ascii[0] == 0x59 and bin_ascii[1] == 0x59 :
-            distance   = bin_ascii[2] + bin_ascii[3] * 256             #Get distance value  
-            strength    = bin_ascii[4] + bin_ascii[5] * 256            #Get Strength value  
-            temperature= (bin_ascii[6] + bin_ascii[7]* 256)/8-256      #Get IC temperature value
-            """
-            bear in mind that serial printing at 20-30Hz drastically slowing down the entire process
-            please use other means of displaying the data using components such as:
-            i2c 16x2 LCD, i2c SSD1306 OLED, 7-segment TM1637, Dot Matrix MAX7219 
-            """
-            print("D: {} cm S: {} T: {} *C\n".format(distance,strength,temperature))
-        UART0.reset_input_buffer()
-        #time.sleep(0.01)
+    for i in range(getLidarFrames(UART0)):
+        distance    = parser.distance[i]
+        strength    = parser.strength[i]
+        temperature = parser.temperature(i)
+        """
+        bear in mind that serial printing at 20-30Hz drastically slowing down the entire process
+        please use other means of displaying the data using components such as:
+        i2c 16x2 LCD, i2c SSD1306 OLED, 7-segment TM1637, Dot Matrix MAX7219 
+        """
+        print("D: {} cm S: {} T: {} *C\n".format(distance,strength,temperature))
 
 # try:
 #     print("getting version")
@@ -1,48 +1,174 @@
 import busio
 import board
 import time
+import supervisor
+from array import array
 from binascii import hexlify
+from Lidar_Parser import LIDAR_PARSER
+from Lidar_Command import LIDAR_COMMAND, ID_GET_VERSION, ID_SAMPLE_FREQ, ID_BAUD_RATE, ID_SAVE_SETTINGS, ID_FULL_VERSION, ticks_diff
+
+TICKS_MASK = 0x1FFFFFFF     # supervisor.ticks_ms() wraps at 2**29
 
 
 class LIDAR:
     
     frame_rate = 20 # default at 20Hz (best tested at 115200)
+    batch_size = 64 # most frames read_frames() returns per call
+    baudrate = 115200
+    flash_baud = 115200 # baud rate kept in the sensor's flash, the one every script opens the UART at
+    # baud rates the TF-Luna supports, most likely first so detect_baud() finds it quickly
+    baud_rates = (115200, 460800, 921600, 230400, 256000, 57600, 38400, 19200, 9600)
     #lidar = busio.UART(tx=board.GP12, rx=board.GP13, baudrate=115200)
     
     def __init__(self):
-        self.lidar = busio.UART(tx=board.GP12, rx=board.GP13, baudrate=115200)    #Define receiving interface of Lidar UART0
+        self.lidar = busio.UART(tx=board.GP12, rx=board.GP13, baudrate=115200, timeout=0, receiver_buffer_size=512)    #Define receiving interface of Lidar UART0, non-blocking reads
+        self.parser = LIDAR_PARSER()
+        self.command = LIDAR_COMMAND(self.lidar, self.parser)
+        # raw distances by default, the sweep tags each one with the servo angle it was taken at and a
+        # filter would mix neighbouring cells and lag edges along the sweep; stationary readers may set
+        # Lidar_Filter.RANGE_FILTER() here
+        self.filter = None
+        # read_frames() batch, reused every call: frames = [dist0, str0, dist1, str1, ...], stamps in ticks_ms
+        self.frames = array('H', [0] * (2 * self.batch_size))
+        self.stamps = array('L', [0] * self.batch_size)
         
     def save_settings(self):
         print("\nSaving setting...")
-        info_packet = [0x5a,0x04,0x11,0x6F]
-        self.lidar.write(bytes(info_packet))
-        time.sleep(.0001)
+        status = self.command.request(ID_SAVE_SETTINGS)
+        if status is None or status[0] != 0:
+            print("Saving settings failed")
+            return False
+        return True
+    
+    def get_version(self):
+        version = self.command.request(ID_FULL_VERSION)
+        if version is None:
+            print("Failed to retrieve version")
+            return None
+        version = version.decode('utf-8')
+        print('\nVersion -'+version+'\n')
+        return version
     
     def set_samp_rate(self, samp_rate=frame_rate):
         # change the sample rate
-        global frame_rate
-        #global lidar
         print("Setting sample rate to {} Hz".format(samp_rate))
         samp_rate = int(samp_rate)
-        frame_rate = samp_rate
-        hex_rate = samp_rate.to_bytes(2,'big')
-        print("hex_rate:{}".format(hex_rate)) # \xHH\xLL => hex_rate[0]=\xHH hex_rate[1]=\xLL 
-        samp_rate_packet = [0x5a,0x06,0x03,hex_rate[1],hex_rate[0],00,00] # sample rate byte array
-        for i in range(len(samp_rate_packet)):
-            print(hex(samp_rate_packet[i]), end=" ")
-        self.lidar.write(bytes(samp_rate_packet)) # send sample rate instruction
-        time.sleep(0.001) # wait for change to take effect
+        echo = self.command.request(ID_SAMPLE_FREQ, samp_rate.to_bytes(2,'little')) # the sensor echoes the rate it actually applied
+        if echo is None:
+            print("No response, sample rate stays at {} Hz".format(self.frame_rate))
+            return self.frame_rate
+        self.frame_rate = echo[0] | (echo[1] << 8)
+        print("Sample rate is now {} Hz".format(self.frame_rate))
         #save_settings()
-        return
+        return self.frame_rate
+    
+    def _link_ok(self, timeout_ms=200):
+        # true once a valid data frame or command response arrives at the current baud rate
+        self.lidar.reset_input_buffer()
+        self.parser.reset()
+        good_frames = self.parser.good_frames
+        self.command.send(ID_GET_VERSION) # answered even when the output rate is 0
+        start = supervisor.ticks_ms()
+        while ticks_diff(supervisor.ticks_ms(), start) < timeout_ms:
+            self.parser.readinto(self.lidar)
+            if self.parser.good_frames > good_frames or self.parser.response_id:
+                return True
+        return False
+    
+    def detect_baud(self):
+        # find the baud rate the sensor is talking at, returns 0 if it does not answer on any
+        for baud in self.baud_rates:
+            self.lidar.baudrate = baud
+            if self._link_ok():
+                self.baudrate = baud
+                print("LiDAR found at {} baud".format(baud))
+                return baud
+        self.lidar.baudrate = self.baudrate
+        print("LiDAR not answering on any baud rate")
+        return 0
+    
+    def set_baud_rate(self, baud):
+        # switch sensor and UART to a new baud rate, returns the baud rate in effect afterwards
+        # the change is not saved, so after a power cycle the sensor is back at its flash baud rate
+        print("Setting baud rate to {}".format(baud))
+        echo = self.command.request(ID_BAUD_RATE, int(baud).to_bytes(4,'little'))
+        if echo is None or (echo[0] | (echo[1] << 8) | (echo[2] << 16) | (echo[3] << 24)) != baud:
+            print("Baud rate change refused, staying at {}".format(self.baudrate))
+            return self.baudrate
+        old_baud = self.baudrate
+        self.lidar.baudrate = baud
+        if self._link_ok():
+            self.baudrate = baud
+            return baud
+        # the sensor did not come up at the new rate, find it again
+        self.lidar.baudrate = old_baud
+        return self.detect_baud() or old_baud
+    
+    def configure(self, rate=250, baud=460800):
+        # bring the sensor up at a high output rate, returns (baudrate, frame_rate) actually in effect
+        # every change is confirmed from the sensor's response, not assumed
+        # only the sample rate is saved, at flash_baud, the faster baud rate lasts until power off
+        # so scripts that open the UART at 115200 (Lidar.py, Lidar_Cicuit.py) still reach the sensor
+        if not self.detect_baud():
+            return (0, 0)
+        if self.baudrate != self.flash_baud:
+            self.set_baud_rate(self.flash_baud)     # left at another rate in flash by an older build
+        self.set_samp_rate(rate)
+        self.save_settings()
+        if baud != self.baudrate:
+            self.set_baud_rate(baud)
+        if rate * 90 > self.baudrate: # 9 bytes of 10 bits per frame
+            print("Warning: {} Hz does not fit in {} baud".format(rate, self.baudrate))
+        print("LiDAR running at {} baud, {} Hz".format(self.baudrate, self.frame_rate))
+        return (self.baudrate, self.frame_rate)
+    
+    def getLidarFrames(self):
+        # decode everything waiting on the UART, returns n with frames in parser.distance/strength/temp_raw[0:n]
+        if self.lidar.in_waiting > 0:
+            return self._decode()
+        return 0
+    
+    def _decode(self):
+        # one parser read, distances are replaced by their filtered value in place
+        n = self.parser.readinto(self.lidar)
+        if self.filter is not None:
+            distance = self.parser.distance
+            for i in range(n):
+                distance[i] = self.filter.update(distance[i])
+        return n
+    
+    def read_frames(self):
+        # drain every frame waiting on the UART in one go, returns n
+        # self.frames[2*i], self.frames[2*i+1] = distance, strength of frame i (oldest first)
+        # self.stamps[i] = ticks_ms when frame i was produced, back-dated one frame period per frame
+        parser = self.parser
+        frames = self.frames
+        n = 0
+        # stop once another full parser read might not fit, the rest stays queued on the UART
+        while self.batch_size - n >= len(parser.distance) and self.lidar.in_waiting > 0:
+            got = self._decode()
+            for i in range(got):
+                frames[2*n] = parser.distance[i]
+                frames[2*n+1] = parser.strength[i]
+                n += 1
+        now = supervisor.ticks_ms()
+        period = 1000 // self.frame_rate
+        for i in range(n):
+            self.stamps[i] = (now - (n - 1 - i) * period) & TICKS_MASK
+        return n
+    
+    def getLidarData(self):
+        # newest valid sample as (distance, strength, temperature), or None if nothing new arrived
+        n = self.getLidarFrames()
+        if n == 0:
+            return None
+        return (self.parser.distance[n-1], self.parser.strength[n-1], self.parser.temperature(n-1))
     
     def getLidarDistance(self):
-        bin_ascii = bytearray()
         distance=0
-        if self.lidar.in_waiting > 0:
-            bin_ascii += self.lidar.read(9)        
-            if bin_ascii[0] == 0x59 and bin_ascii[1] == 0x59:
-                distance = bin_ascii[2] + bin_ascii[3] *256
-        self.lidar.reset_input_buffer()
+        n = self.getLidarFrames()
+        if n:
+            distance = self.parser.distance[n-1]    # newest frame, older ones are still counted by the parser
         #print("Value: %.2f" % distance)
         return distance
     
@@ -0,0 +1,76 @@
+"""
+Command frames for the TF-Luna / TFmini-Plus
+
+host -> sensor : 0x5A, Len, ID, Payload..., Checksum
+sensor -> host : 0x5A, Len, ID, Payload..., Checksum
+Len counts every byte of the frame, Checksum is the lower 8 bits of the sum of all previous bytes.
+
+Responses come back mixed in with the 0x59 0x59 data frames and are picked
+out by LIDAR_PARSER, so the UART keeps streaming while a command is pending.
+request() waits for the matching response instead of sleeping a fixed time and
+resends with a doubling timeout, so configuration finishes as soon as the
+sensor has answered and gives up within a bounded time if it never does.
+"""
+try:
+    from supervisor import ticks_ms     # CircuitPython
+    TICKS_PERIOD = 1 << 29
+except ImportError:
+    from time import ticks_ms           # MicroPython
+    TICKS_PERIOD = 1 << 30
+
+ID_GET_VERSION = 0x01
+ID_SOFT_RESET = 0x02
+ID_SAMPLE_FREQ = 0x03
+ID_BAUD_RATE = 0x06
+ID_SAVE_SETTINGS = 0x11
+ID_FULL_VERSION = 0x14      # 30 byte ASCII version string
+
+MAX_TIMEOUT_MS = 200        # backoff ceiling for a single attempt
+
+
+def ticks_diff(end, start):
+    return ((end - start + TICKS_PERIOD // 2) % TICKS_PERIOD) - TICKS_PERIOD // 2
+
+
+def build_packet(cmd_id, payload=b''):
+    packet = bytearray(4 + len(payload))
+    packet[0] = 0x5A
+    packet[1] = len(packet)
+    packet[2] = cmd_id
+    packet[3:3 + len(payload)] = payload
+    packet[-1] = sum(packet[:-1]) & 0xFF
+    return packet
+
+
+class LIDAR_COMMAND:
+
+    def __init__(self, uart, parser):
+        self.uart = uart
+        self.parser = parser
+
+    def send(self, cmd_id, payload=b''):
+        self.parser.response_id = 0     # forget any stale response before asking again
+        self.parser.expect_id = cmd_id  # the parser only picks out a response to this command
+        self.uart.write(build_packet(cmd_id, payload))
+
+    def wait(self, cmd_id, timeout_ms=100):
+        # keep reading until the response for cmd_id shows up, returns its payload or None on timeout
+        parser = self.parser
+        start = ticks_ms()
+        while ticks_diff(ticks_ms(), start) < timeout_ms:
+            parser.readinto(self.uart)
+            if parser.response_id == cmd_id:
+                parser.response_id = 0
+                return bytes(parser.response[3:parser.response_len - 1])
+        return None
+
+    def request(self, cmd_id, payload=b'', timeout_ms=20, retries=4):
+        # send and wait for the matching response, resending with a doubled timeout after each miss
+        # returns the response payload, or None once all retries are used up
+        for attempt in range(retries):
+            self.send(cmd_id, payload)
+            response = self.wait(cmd_id, timeout_ms)
+            if response is not None:
+                return response
+            timeout_ms = min(timeout_ms * 2, MAX_TIMEOUT_MS)
+        return None
@@ -0,0 +1,63 @@
+"""
+Fixed-point range filter for the LiDAR samples
+
+A median over a sliding window of the last N distances throws away single
+frame spikes (edge hits, multipath), then an exponential moving average
+smooths what is left:
+    ema += (median - ema) / 2**ema_shift
+Everything is integer math on preallocated arrays, so it runs on every frame
+on the Pico without floats or allocation. The EMA state keeps EMA_FRAC_BITS
+of fraction so small steps are not lost to truncation.
+
+It is meant for a sensor held still: LIDAR leaves it off (filter = None)
+because on a sweeping servo the window spans several angle cells and the
+EMA lag shifts edges in the sweep direction.
+"""
+from array import array
+
+EMA_FRAC_BITS = 4
+
+
+class RANGE_FILTER:
+
+    def __init__(self, window=5, ema_shift=2):
+        self.size = window              # odd, so the median is a real sample
+        self.window = array('H', [0] * window)
+        self.sorted = array('H', [0] * window)
+        self.index = 0
+        self.count = 0
+        self.ema_shift = ema_shift      # alpha = 1/2**ema_shift, 2 -> 0.25
+        self.ema = -1                   # fixed point, -1 until the first sample
+
+    def update(self, distance):
+        # push one raw distance in cm, returns the filtered distance in cm
+        window = self.window
+        window[self.index] = distance
+        self.index += 1
+        if self.index == self.size:
+            self.index = 0
+        if self.count < self.size:
+            self.count += 1
+        count = self.count
+
+        # insertion sort of the filled part of the window into the scratch array
+        s = self.sorted
+        for i in range(count):
+            v = window[i]
+            j = i
+            while j > 0 and s[j-1] > v:
+                s[j] = s[j-1]
+                j -= 1
+            s[j] = v
+        median = s[count >> 1] << EMA_FRAC_BITS
+
+        if self.ema < 0:
+            self.ema = median
+        else:
+            self.ema += (median - self.ema) >> self.ema_shift
+        return (self.ema + (1 << (EMA_FRAC_BITS - 1))) >> EMA_FRAC_BITS
+
+    def reset(self):
+        self.index = 0
+        self.count = 0
+        self.ema = -1
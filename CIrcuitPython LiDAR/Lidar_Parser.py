@@ -0,0 +1,160 @@
+"""
+Streaming frame parser for the TF-Luna / TFmini-Plus UART output
+
+byte[0] = 0x59
+byte[1] = 0x59
+byte[2] = Dist_L
+byte[3] = Dist_H
+byte[4] = Strength_L
+byte[5] = Strength_H
+byte[6] = Temp_L
+byte[7] = Temp_H
+byte[8] = Checksum
+total = byte[0]+byte[1]+byte[2]+byte[3]+byte[4]+byte[5]+byte[6]+byte[7]
+the lower 8 bits [LSB] of the total is the checksum
+
+The UART is read with readinto() straight into a preallocated buffer, so a read
+that starts or ends in the middle of a frame is kept and completed by the next
+read instead of being thrown away. The parser hunts for the 0x59 0x59 header,
+verifies the checksum and decodes every complete frame into preallocated arrays.
+Command responses (0x5A, Len, ID, Payload..., Checksum) interleaved with the
+data frames are picked out as well and kept in `response` until read. A 0x5A
+byte only starts a response while a command is waiting for one (expect_id) and
+the ID matches, and the checksum is verified before any bytes are consumed.
+A candidate that has not fully arrived yet is dropped as soon as a valid data
+frame turns up inside the bytes it claims, so a stray 0x5A with a bogus length
+never holds back the data frames behind it.
+
+Frames the sensor flags as unreliable are dropped during decode: a signal
+strength below min_strength, a saturated strength of 65535 or a distance of 0.
+The checks are integer compares on the raw fields, so they cost almost nothing
+at the full frame rate. Set min_strength = 0 to get every frame with a distance.
+Nothing on the read/decode path allocates, which keeps the GC out of the scan loop.
+"""
+from array import array
+
+FRAME_HEADER = 0x59
+FRAME_LEN = 9
+RESPONSE_HEADER = 0x5A
+RESPONSE_MAX = 32       # longest command response, the full version string is 30 bytes
+STRENGTH_SATURATED = 65535
+
+
+class LIDAR_PARSER:
+
+    min_strength = 100              # below this the TF-Luna/TFmini distance is unreliable
+
+    def __init__(self, size=256):
+        self.buf = bytearray(size)
+        buf_view = memoryview(self.buf)
+        # write windows behind a carried partial frame, built once so readinto never slices
+        self.tails = [buf_view[i:] for i in range(RESPONSE_MAX)]
+        self.count = 0          # bytes currently held in buf
+        self.frames = 0         # frames decoded by the last parse()
+        max_frames = size // FRAME_LEN
+        self.distance = array('H', [0] * max_frames)
+        self.strength = array('H', [0] * max_frames)
+        self.temp_raw = array('H', [0] * max_frames)
+        self.good_frames = 0
+        self.bad_frames = 0     # header found but checksum failed
+        self.rejected = 0       # valid frames dropped for a zero distance or low/saturated strength
+        self.response = bytearray(RESPONSE_MAX)
+        self.response_len = 0
+        self.response_id = 0    # command ID of the last response, cleared by whoever consumes it
+        self.expect_id = 0      # command ID a response is awaited for, 0 when no command is pending
+
+    def readinto(self, uart):
+        # read whatever the UART has into the free part of buf, then decode
+        # the UART must be non-blocking (timeout=0) so this never waits for a full buffer
+        n = uart.readinto(self.tails[self.count])
+        if n:
+            self.count += n
+        return self.parse()
+
+    def parse(self):
+        # decodes every valid frame in buf into distance/strength/temp_raw[0:n] and returns n
+        buf = self.buf
+        end = self.count
+        i = 0
+        n = 0
+        while i < end:
+            if buf[i] == RESPONSE_HEADER and self.expect_id:
+                used = self._parse_response(i, end)
+                if used == 0:
+                    break       # response not complete yet
+                i += used
+                continue
+            if buf[i] != FRAME_HEADER:
+                i += 1          # resync: slide forward one byte at a time until a header lines up
+                continue
+            if end - i < FRAME_LEN:
+                break
+            if buf[i+1] != FRAME_HEADER:
+                i += 1
+                continue
+            checksum = (buf[i] + buf[i+1] + buf[i+2] + buf[i+3] + buf[i+4] + buf[i+5] + buf[i+6] + buf[i+7]) & 0xFF
+            if checksum != buf[i+8]:
+                self.bad_frames += 1
+                i += 1          # 0x59 0x59 can appear inside a payload, so only drop one byte
+                continue
+            distance = buf[i+2] | (buf[i+3] << 8)      #Get distance value
+            strength = buf[i+4] | (buf[i+5] << 8)      #Get Strength value
+            temp_raw = buf[i+6] | (buf[i+7] << 8)      #Get IC temperature value (raw)
+            if distance == 0 or strength < self.min_strength or strength == STRENGTH_SATURATED:
+                self.rejected += 1
+                i += FRAME_LEN
+                continue
+            self.distance[n] = distance
+            self.strength[n] = strength
+            self.temp_raw[n] = temp_raw
+            n += 1
+            i += FRAME_LEN
+        # carry the unfinished frame (< RESPONSE_MAX bytes) to the front for the next read
+        rest = end - i
+        for j in range(rest):
+            buf[j] = buf[i+j]
+        self.count = rest
+        self.frames = n
+        self.good_frames += n
+        return n
+
+    def _frame_ok(self, i):
+        # true if buf[i:i+9] holds a data frame with a valid checksum, parse() inlines the same sum
+        buf = self.buf
+        checksum = (buf[i] + buf[i+1] + buf[i+2] + buf[i+3] + buf[i+4] + buf[i+5] + buf[i+6] + buf[i+7]) & 0xFF
+        return checksum == buf[i+8]
+
+    def _parse_response(self, i, end):
+        # returns the bytes to step over: the response length, 1 if this is not a response, 0 if incomplete
+        buf = self.buf
+        if end - i < 3:
+            return 0
+        length = buf[i+1]
+        if length < 4 or length > RESPONSE_MAX or buf[i+2] != self.expect_id:
+            return 1
+        if end - i < length:
+            # a real response arrives in one piece, a data frame inside its span means this 0x5A was payload
+            for j in range(i + 1, min(i + length, end - FRAME_LEN + 1)):
+                if buf[j] == FRAME_HEADER and buf[j+1] == FRAME_HEADER and self._frame_ok(j):
+                    return 1
+            return 0
+        checksum = 0
+        for j in range(length - 1):
+            checksum += buf[i+j]
+        if (checksum & 0xFF) != buf[i+length-1]:
+            self.bad_frames += 1
+            return 1
+        for j in range(length):
+            self.response[j] = buf[i+j]
+        self.response_len = length
+        self.response_id = buf[i+2]
+        self.expect_id = 0
+        return length
+
+    def temperature(self, index):
+        # IC temperature in *C of frame `index` from the last parse()
+        return self.temp_raw[index]/8-256
+
+    def reset(self):
+        self.count = 0
+        self.frames = 0
@@ -0,0 +1,67 @@
+import math
+import displayio
+from array import array
+
+RED_LIMIT = 100     # cm
+YELLOW_LIMIT = 250  # cm
+
+BLANK = 0
+RED = 1
+YELLOW = 2
+GREEN = 3
+NO_POINT = 0xFFFF
+
+
+class RADAR_DISPLAY:
+    # Radar-style polar plot drawn into a single 4-colour bitmap instead of one Circle
+    # TileGrid per point. The fan is centred on the bottom middle of the plot, 0 degrees
+    # to the right and 180 to the left, with range growing outwards up to max_range.
+    # Every (angle cell, range bin) pixel position is worked out once into lookup
+    # tables, so plotting a sample is one table read and one bitmap write.
+    # Each angle cell keeps its last point; plot() clears it and sets the new one, so
+    # only changed pixels are touched and displayio only sends those on refresh.
+
+    def __init__(self, group, cells=90, width=96, height=50, max_range=800):
+        self.cells = cells
+        self.bitmap = displayio.Bitmap(width, height, 4)
+        self.palette = displayio.Palette(4)
+        self.palette[BLANK] = 0x000000
+        self.palette[RED] = 0xFC0303
+        self.palette[YELLOW] = 0xFCF403
+        self.palette[GREEN] = 0x03FC03
+
+        # one range bin per pixel of radius
+        cx = width // 2
+        cy = height - 1
+        self.bins = min(cx, cy)
+        self.bin_cm = max_range // self.bins + 1
+        self.lut_x = bytearray(cells * self.bins)
+        self.lut_y = bytearray(cells * self.bins)
+        for index in range(cells):
+            a = math.radians(index * 180 / cells)   # centre of the cell, SCANNER rounds angles to the nearest cell
+            c = math.cos(a)
+            s = math.sin(a)
+            for r in range(self.bins):
+                self.lut_x[index * self.bins + r] = int(cx + r * c + 0.5)
+                self.lut_y[index * self.bins + r] = int(cy - r * s + 0.5)
+
+        self.point = array('H', [NO_POINT] * cells)  # lut slot currently lit for each cell
+        group.append(displayio.TileGrid(self.bitmap, pixel_shader=self.palette, x=0, y=0))
+
+    def plot(self, index, dist):
+        # draw the range of angle cell `index`
+        r = dist // self.bin_cm
+        if r >= self.bins:
+            r = self.bins - 1
+        slot = index * self.bins + r
+        if dist < RED_LIMIT:
+            color = RED
+        elif dist < YELLOW_LIMIT:
+            color = YELLOW
+        else:
+            color = GREEN
+        old = self.point[index]
+        if old != NO_POINT and old != slot:
+            self.bitmap[self.lut_x[old], self.lut_y[old]] = BLANK
+        self.bitmap[self.lut_x[slot], self.lut_y[slot]] = color
+        self.point[index] = slot
@@ -0,0 +1,77 @@
+import time
+import displayio
+from array import array
+
+
+class READOUT:
+    # Fixed-width text line for numbers that change every frame, e.g. "Ang:### D:####".
+    # Every '#' in the layout is a digit slot, right-aligned per run of '#'.
+    # The whole line is one TileGrid over the font's own glyph sheet, one tile per
+    # character, so changing a digit is a single tile index write. Label.text
+    # rebuilds a TileGrid for every character instead. The glyph tiles for 0-9 and
+    # space are looked up once, slots that already show the right digit are skipped,
+    # and new values only reach the tiles every refresh_period seconds.
+
+    def __init__(self, group, font, layout, x=0, y=0, color=0xFFFFFF, refresh_period=0.2):
+        glyph = font.get_glyph(ord('0'))    # fixed-width font, every glyph shares this sheet and size
+        self.palette = displayio.Palette(2)
+        self.palette[0] = 0x000000
+        self.palette.make_transparent(0)
+        self.palette[1] = color
+        self.grid = displayio.TileGrid(glyph.bitmap, pixel_shader=self.palette, width=len(layout), height=1,
+                                       tile_width=glyph.width, tile_height=glyph.height, x=x, y=y)
+        self.digit_tiles = array('H', [font.get_glyph(ord(str(d))).tile_index for d in range(10)])
+        self.blank_tile = font.get_glyph(ord(' ')).tile_index
+        self.shown = array('H', [0] * len(layout))    # tile currently in each position
+
+        # static text goes in once, each run of '#' becomes a field (start, length)
+        self.starts = []
+        self.lengths = []
+        for i in range(len(layout)):
+            if layout[i] == '#':
+                if i == 0 or layout[i-1] != '#':
+                    self.starts.append(i)
+                    self.lengths.append(0)
+                self.lengths[-1] += 1
+                tile = self.blank_tile
+            else:
+                tile = font.get_glyph(ord(layout[i])).tile_index
+            self.grid[i] = tile
+            self.shown[i] = tile
+        self.values = [0] * len(self.starts)
+        self.pending = False
+        self.refresh_period = refresh_period
+        self.last_refresh = 0
+        group.append(self.grid)
+
+    def set(self, field, value):
+        self.values[field] = value
+        self.pending = True
+
+    def refresh(self):
+        # write pending values to the tiles, at most once per refresh_period, returns True if it did
+        now = time.monotonic()
+        if not self.pending or now - self.last_refresh < self.refresh_period:
+            return False
+        self.last_refresh = now
+        self.pending = False
+        for field in range(len(self.starts)):
+            start = self.starts[field]
+            pos = start + self.lengths[field] - 1
+            value = self.values[field]
+            if value < 0:
+                value = 0
+            limit = 10 ** self.lengths[field] - 1
+            if value > limit:
+                value = limit
+            while pos >= start:
+                if value or pos == start + self.lengths[field] - 1:
+                    tile = self.digit_tiles[value % 10]
+                    value //= 10
+                else:
+                    tile = self.blank_tile
+                if self.shown[pos] != tile:
+                    self.grid[pos] = tile
+                    self.shown[pos] = tile
+                pos -= 1
+        return True
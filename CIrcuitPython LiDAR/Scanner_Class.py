@@ -0,0 +1,162 @@
+import asyncio
+import displayio
+import terminalio #Just a font
+from array import array
+from Radar_Display import RADAR_DISPLAY, RED_LIMIT, YELLOW_LIMIT
+from Readout import READOUT
+
+
+class SCANNER:
+    # Sweeps the LiDAR on the servo as four cooperative tasks, each at its own rate:
+    # sensor reads, servo stepping, display refresh and serial output.
+    # A slow display redraw only delays the next redraw, never a sensor read.
+    # Every frame is tagged with the servo angle at the moment it was measured
+    # (SERVO.angleAt on the frame timestamp), so a sweep is a real (angle, range) scan.
+    # angleAt also applies the per-direction backlash offsets from calibrate.py, so
+    # forward and reverse passes land in the same cells and both count as scan data.
+    # With adaptive on, the sweep moves in coarse steps and only slows to fine
+    # steps, and dwells, where the last pass saw something inside the yellow/red limits.
+    # With a UART_SERIAL every tagged frame goes out as a binary telemetry frame from
+    # sensor_task, otherwise the newest distance is printed to the USB console as before.
+    # Needs the asyncio and adafruit_ticks libraries from the CircuitPython bundle.
+
+    sensor_period = 0.005   # s between LiDAR polls
+    servo_period = 0.02     # s between servo ticks, one PWM frame (SERVO.tick_period)
+    display_period = 0.1    # s between display refreshes
+    serial_period = 0.02    # s between console prints when there is no UART_SERIAL
+    step = 2                # degrees per fine sweep step, also the width of a range cell
+    coarse_step = 6         # degrees per step through clear sectors when adaptive
+    adaptive = True
+    dwell_time = 0.03       # s extra at each step where the range is inside RED_LIMIT
+    slices_per_step = 2     # servo ticks per sweep step
+
+    def __init__(self, lidar, servo, display, serial=None):
+        self.lidar = lidar
+        self.servo = servo
+        self.display = display
+        self.serial = serial
+        self.ang = 0
+        self.fw = 1
+        self.dist = 0           # newest sample: distance, strength, servo angle and ticks_ms timestamp
+        self.strength = 0
+        self.sample_angle = 0
+        self.sample_stamp = 0
+        self.new_sample = False
+        cells = 180 // self.step
+        self.ranges = array('H', [0] * cells)   # newest distance per step-wide angle cell
+        self.dirty = bytearray(cells)           # cells changed since the last display refresh
+
+        # Make the display context, refreshed by display_task only
+        self.splash = displayio.Group()
+        display.auto_refresh = False
+        display.show(self.splash)
+
+        self.radar = RADAR_DISPLAY(self.splash, cells)
+
+        # angle and distance readout under the plot, fields 0 and 1
+        self.readout = READOUT(self.splash, terminalio.FONT, "Ang:### D:####", x=1, y=50)
+
+    async def sensor_task(self):
+        lidar = self.lidar
+        servo = self.servo
+        serial = self.serial
+        last_cell = len(self.ranges) - 1
+        while True:
+            n = lidar.read_frames()
+            for i in range(n):
+                stamp = lidar.stamps[i]
+                angle = servo.angleAt(stamp)
+                index = int(angle / self.step + 0.5)
+                if index < 0:
+                    index = 0
+                elif index > last_cell:
+                    index = last_cell
+                self.ranges[index] = lidar.frames[2*i]
+                self.dirty[index] = 1
+                if serial is not None:      # every frame, the host counts gaps in the sequence as drops
+                    serial.sendFrame(stamp, angle, lidar.frames[2*i], lidar.frames[2*i+1])
+            if n:
+                self.dist = lidar.frames[2*(n-1)]
+                self.strength = lidar.frames[2*(n-1)+1]
+                self.sample_angle = angle
+                self.sample_stamp = stamp
+                self.new_sample = True
+            await asyncio.sleep(self.sensor_period)
+
+    def sector_close(self, ang, span):
+        # True if any cell within span degrees of ang was inside YELLOW_LIMIT on the last pass
+        first = (ang - span) // self.step
+        last = (ang + span) // self.step
+        if first < 0:
+            first = 0
+        if last > len(self.ranges) - 1:
+            last = len(self.ranges) - 1
+        for index in range(first, last + 1):
+            dist = self.ranges[index]
+            if 0 < dist < YELLOW_LIMIT:
+                return True
+        return False
+
+    def next_step(self):
+        # fine steps through sectors that had obstacles, coarse everywhere else
+        if self.adaptive and not self.sector_close(self.ang, self.coarse_step):
+            return self.coarse_step
+        return self.step
+
+    async def servo_task(self):
+        servo = self.servo
+        if not self.adaptive:
+            # fixed sweep: the whole trajectory is planned once and only played back here
+            servo.planSweep(self.step, 180 - self.step, self.step, self.slices_per_step)
+            while True:
+                servo.tick()
+                self.ang = int(servo.angle)
+                await asyncio.sleep(self.servo_period)
+        while True:
+            step = self.next_step()
+            if self.fw == 1:
+                self.ang = self.ang + step
+            else:
+                self.ang = self.ang - step
+            if self.ang >= 180:
+                self.fw = 0
+                self.ang = 180 - self.step
+            if self.ang <= 0 :
+                self.fw = 1
+                self.ang = self.step
+            servo.planMove(self.ang, self.slices_per_step)
+            while servo.tick():
+                await asyncio.sleep(self.servo_period)
+            dist = self.ranges[self.ang // self.step]
+            if 0 < dist < RED_LIMIT:
+                await asyncio.sleep(self.dwell_time)   # extra frames on the closest obstacles
+
+    async def display_task(self):
+        while True:
+            for index in range(len(self.dirty)):
+                if self.dirty[index]:
+                    self.dirty[index] = 0
+                    self.radar.plot(index, self.ranges[index])
+            self.readout.set(0, 180 - int(self.sample_angle))
+            self.readout.set(1, self.dist)
+            self.readout.refresh()
+            self.display.refresh()
+            await asyncio.sleep(self.display_period)
+
+    async def serial_task(self):
+        # console prints of the newest distance, telemetry frames are sent by sensor_task
+        if self.serial is not None:
+            return
+        while True:
+            if self.new_sample:
+                self.new_sample = False
+                print(self.dist)
+            await asyncio.sleep(self.serial_period)
+
+    async def run(self):
+        await asyncio.gather(
+            asyncio.create_task(self.sensor_task()),
+            asyncio.create_task(self.servo_task()),
+            asyncio.create_task(self.display_task()),
+            asyncio.create_task(self.serial_task()),
+        )
@@ -1,14 +1,123 @@
-import time, random, board
+import time, random, board, os
+from array import array
 from pwmio import PWMOut
 from adafruit_motor import servo
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+ACTUATION_RANGE = 180
+PWM_FREQUENCY = 50
 
 class SERVO:
     
+    settle_ms = 20  # lag between a new pulse width and the shaft following it
+    history = 32    # commanded angles kept for angleAt()
+    resolution = 10 # duty_lut entries per degree
+    tick_period = 1 / PWM_FREQUENCY # the servo only sees one new pulse width per PWM frame
+    plan_size = 2048
+    
     def __init__(self):
-        self.servoA = servo.Servo(PWMOut(board.GP15, frequency=50), min_pulse=500, max_pulse=2250)
+        self.pwm = PWMOut(board.GP15, frequency=PWM_FREQUENCY)
+        self.servoA = servo.Servo(self.pwm, min_pulse=500, max_pulse=2250)
+        # duty cycle for every 1/resolution degree, the same mapping servoA.angle does in floats on every write
+        steps = ACTUATION_RANGE * self.resolution
+        self.duty_lut = array('H', [0] * (steps + 1))
+        for i in range(steps + 1):
+            self.duty_lut[i] = self.servoA._min_duty + int(i / steps * self.servoA._duty_range)
+        # planned trajectory as duty_lut indices, played back one entry per tick()
+        self.plan = array('H', [0] * self.plan_size)
+        self.plan_len = 0
+        self.plan_pos = 0
+        self.plan_loop = False
+        self.plan_end = 0   # duty_lut index the plan finishes on
+        self.angle = 0.0    # last commanded angle
+        self.direction = 1  # last direction of travel, 1 towards 180, -1 towards 0
+        # backlash correction per direction of travel, tenths of a degree in settings.toml
+        self.offset_fwd = int(os.getenv('SERVO_OFFSET_FWD', 0)) / 10
+        self.offset_rev = int(os.getenv('SERVO_OFFSET_REV', 0)) / 10
+        # ring of (ticks_ms, commanded angle, direction of travel), newest at head-1
+        self.stamps = array('L', [0] * self.history)
+        self.angles = array('f', [0.0] * self.history)
+        self.directions = array('b', [0] * self.history)
+        self.head = 0
+        self.count = 0
+    
+    def _index(self, angle):
+        index = int(angle * self.resolution + 0.5)
+        if index < 0:
+            return 0
+        if index >= len(self.duty_lut):
+            return len(self.duty_lut) - 1
+        return index
+    
+    def _write(self, index):
+        self.pwm.duty_cycle = self.duty_lut[index]
+        self._record(index / self.resolution)
+    
+    def _record(self, angle):
+        if angle > self.angle:
+            self.direction = 1
+        elif angle < self.angle:
+            self.direction = -1
+        self.angle = angle
+        self.stamps[self.head] = ticks_ms()
+        self.angles[self.head] = angle
+        self.directions[self.head] = self.direction
+        self.head = (self.head + 1) % self.history
+        if self.count < self.history:
+            self.count += 1
     
     def moveToAngle(self, angle):
-        self.servoA.angle = angle
+        index = self._index(angle)
+        self._write(index)
+        self.plan_end = index
+    
+    def planMove(self, target, slices=2, append=False):
+        # plan a move to target in `slices` evenly spaced ticks, the last one exactly on target
+        # append=True continues from the end of the current plan, returns the plan length
+        if append:
+            start = self.plan_end
+        else:
+            start = self._index(self.angle)
+            self.plan_len = 0
+            self.plan_pos = 0
+            self.plan_loop = False
+        end = self._index(target)
+        for k in range(1, slices + 1):
+            if self.plan_len == self.plan_size:
+                break
+            self.plan[self.plan_len] = start + (end - start) * k // slices
+            self.plan_len += 1
+        self.plan_end = end
+        return self.plan_len
+    
+    def planSweep(self, start, end, step, slices=2):
+        # plan the whole start -> end -> start sweep once, tick() then plays it in a loop
+        self.plan_len = 0
+        self.plan_pos = 0
+        self.plan_end = self._index(start)
+        ang = start
+        while ang < end:
+            ang = min(ang + step, end)
+            self.planMove(ang, slices, append=True)
+        while ang > start:
+            ang = max(ang - step, start)
+            self.planMove(ang, slices, append=True)
+        self.plan_loop = True
+        return self.plan_len
+    
+    def tick(self):
+        # write the next planned pulse width, returns False once a one-shot plan has finished
+        if self.plan_pos >= self.plan_len:
+            if not self.plan_loop or self.plan_len == 0:
+                return False
+            self.plan_pos = 0
+        self._write(self.plan[self.plan_pos])
+        self.plan_pos += 1
+        return True
+    
+    def easeToAngle(self, angle, ease_speed=0.1):
+        # one ease slice towards angle, for callers that do their own timing (SCANNER)
+        self.moveToAngle(self.angle + (angle - self.angle) * ease_speed)
     
     def moveSmoothToAngle(self, angle):
         ani_pos = 0
@@ -16,7 +125,40 @@ class SERVO:
         num_ease_slices = 10
         secs = 0.05
         
-        for i in range(num_ease_slices):
-            self.servoA.angle += (angle - self.servoA.angle) * ease_speed
+        for i in range(num_ease_slices - 1):
+            self.easeToAngle(angle, ease_speed)
             time.sleep(secs/num_ease_slices)
-        
\ No newline at end of file
+        self.moveToAngle(angle) # easing alone stops ~35% short, land on the target in the last slice
+        time.sleep(secs/num_ease_slices)
+    
+    def angleAt(self, ticks, corrected=True):
+        # estimated shaft angle at ticks (ms): the commanded angle settle_ms earlier,
+        # interpolated between the two commands either side of it, plus the backlash
+        # offset for the direction the servo was moving in (see calibrate.py)
+        t = ticks_add(ticks, -self.settle_ms)
+        newer = -1
+        slot = -1
+        angle = self.angle
+        for k in range(self.count):
+            slot = (self.head - 1 - k) % self.history
+            dt = ticks_diff(t, self.stamps[slot])
+            if dt >= 0:
+                angle = self.angles[slot]
+                if newer >= 0:
+                    span = ticks_diff(self.stamps[newer], self.stamps[slot])
+                    if span > 0:
+                        angle += (self.angles[newer] - angle) * dt / span
+                    else:
+                        angle = self.angles[newer]
+                    slot = newer    # moving towards newer, so its direction applies
+                break
+            newer = slot
+        else:
+            if newer >= 0:
+                angle = self.angles[newer]  # older than the whole history
+        if corrected and slot >= 0:
+            if self.directions[slot] >= 0:
+                angle += self.offset_fwd
+            else:
+                angle += self.offset_rev
+        return angle
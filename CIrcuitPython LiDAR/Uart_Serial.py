@@ -1,13 +1,57 @@
 import busio
 import board
 import time
+import struct
+from array import array
 from binascii import hexlify
 
+# Binary telemetry frame, little endian, 15 bytes:
+#   sync      2  0xA5 0x5A
+#   seq       1  counts up and wraps at 256, a gap means frames were dropped
+#   stamp     4  supervisor.ticks_ms when the sample was measured (wraps at 2**29)
+#   angle     2  servo angle in tenths of a degree
+#   distance  2  cm
+#   strength  2  signal strength
+#   crc       2  CRC-16/CCITT-FALSE of the 13 bytes before it
+SYNC = b'\xA5\x5A'
+FRAME_FORMAT = '<2sBIHHH'
+FRAME_SIZE = 15
+CRC_OFFSET = 13
+
+
+def _crc_table():
+    table = array('H', [0] * 256)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+            else:
+                crc = (crc << 1) & 0xFFFF
+        table[i] = crc
+    return table
+
+CRC_TABLE = _crc_table()
+
+
+def crc16(data, length):
+    # CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), same as binascii.crc_hqx(data, 0xFFFF)
+    crc = 0xFFFF
+    for i in range(length):
+        crc = ((crc << 8) & 0xFFFF) ^ CRC_TABLE[((crc >> 8) ^ data[i]) & 0xFF]
+    return crc
+
 
 class UART_SERIAL:
  
-    def __init__(self):
-        self.serial = busio.UART(tx=board.GP8, rx=board.GP9, baudrate=115200)    #Define receiving interface of Lidar UART1
+    def __init__(self, port=None):
+        # port: a stream to send on, e.g. usb_cdc.data (enabled in boot.py) to reach the host over USB
+        # without one the frames go out on the GP8/GP9 UART, which needs a USB-serial adapter on the host
+        if port is None:
+            port = busio.UART(tx=board.GP8, rx=board.GP9, baudrate=115200)    #Define receiving interface of Lidar UART1
+        self.serial = port
+        self.frame = bytearray(FRAME_SIZE)     # reused for every telemetry frame
+        self.sequence = 0
     
     def message(self,message):
         self.serial.write(bytes(f"<{message}>", "ascii"))
@@ -15,6 +59,19 @@ class UART_SERIAL:
     def sendMessage(self, message):
         hex_message = message.to_bytes(2,'big')
         self.serial.write(bytes(hex_message))
+
+    def sendFrame(self, stamp, angle, distance, strength):
+        # one LiDAR sample as a binary telemetry frame, angle in degrees
+        frame = self.frame
+        angle = int(angle * 10 + 0.5)
+        if angle < 0:
+            angle = 0
+        struct.pack_into(FRAME_FORMAT, frame, 0, SYNC, self.sequence, stamp, angle, distance, strength)
+        crc = crc16(frame, CRC_OFFSET)
+        frame[CRC_OFFSET] = crc & 0xFF
+        frame[CRC_OFFSET + 1] = crc >> 8
+        self.serial.write(frame)
+        self.sequence = (self.sequence + 1) & 0xFF
     
     def readLine(self):
         return self.serial.readline()
@@ -32,10 +32,22 @@ from adafruit_display_shapes.polygon import Polygon
 
 
 class _CyclicBuffer:
-    def __init__(self, size: int, init_value: T) -> None:
+    def __init__(self, size: int, init_value: T, track_extremes: bool = False) -> None:
         self._buffer = [init_value] * size
         self._start = 0  # between 0 and size-1
         self._end = 0  # between 0 and 2*size-1
+        self._track_extremes = track_extremes
+        if track_extremes:
+            # Monotonic queues of buffer slots, each in a ring of its own. The values
+            # at the slots in _lows rise from front to back and those in _highs fall,
+            # so the fronts are the minimum and maximum of the valid data. Every
+            # value is queued and dropped at most once, so both stay O(1) amortized.
+            self._lows = [0] * size
+            self._low_start = 0
+            self._low_len = 0
+            self._highs = [0] * size
+            self._high_start = 0
+            self._high_len = 0
 
     def push(self, value: T) -> None:
         """Pushes value at the end of the buffer.
@@ -46,15 +58,42 @@ class _CyclicBuffer:
 
         if self.len() == len(self._buffer):
             raise RuntimeError("Trying to push to full buffer")
-        self._buffer[self._end % len(self._buffer)] = value
+        size = len(self._buffer)
+        slot = self._end % size
+        self._buffer[slot] = value
         self._end += 1
 
+        if self._track_extremes:
+            # drop queued values that can no longer be the min/max, then queue this one
+            buffer = self._buffer
+            lows = self._lows
+            count = self._low_len
+            while count and buffer[lows[(self._low_start + count - 1) % size]] > value:
+                count -= 1
+            lows[(self._low_start + count) % size] = slot
+            self._low_len = count + 1
+
+            highs = self._highs
+            count = self._high_len
+            while count and buffer[highs[(self._high_start + count - 1) % size]] < value:
+                count -= 1
+            highs[(self._high_start + count) % size] = slot
+            self._high_len = count + 1
+
     def pop(self) -> T:
         """Pop value from the start of the buffer and returns it."""
 
         if self.len() == 0:
             raise RuntimeError("Trying to pop from empty buffer")
         result = self._buffer[self._start]
+        if self._track_extremes:
+            # the oldest value leaves the queues too if it is at their front
+            if self._lows[self._low_start] == self._start:
+                self._low_start = (self._low_start + 1) % len(self._buffer)
+                self._low_len -= 1
+            if self._highs[self._high_start] == self._start:
+                self._high_start = (self._high_start + 1) % len(self._buffer)
+                self._high_len -= 1
         self._start += 1
         if self._start == len(self._buffer):
             self._start -= len(self._buffer)
@@ -71,6 +110,9 @@ class _CyclicBuffer:
 
         self._start = 0
         self._end = 0
+        if self._track_extremes:
+            self._low_len = 0
+            self._high_len = 0
 
     def values(self) -> List[T]:
         """Returns valid data from the buffer."""
@@ -83,6 +125,25 @@ class _CyclicBuffer:
             return self._buffer[start:end]
         return self._buffer[start:] + self._buffer[:end]
 
+    def at(self, index: int) -> T:
+        """Returns the value at index, counted from the start of the valid data."""
+
+        return self._buffer[(self._start + index) % len(self._buffer)]
+
+    def min_value(self) -> T:
+        """Returns the smallest valid value, needs track_extremes."""
+
+        if self.len() == 0:
+            raise RuntimeError("Trying to read from empty buffer")
+        return self._buffer[self._lows[self._low_start]]
+
+    def max_value(self) -> T:
+        """Returns the largest valid value, needs track_extremes."""
+
+        if self.len() == 0:
+            raise RuntimeError("Trying to read from empty buffer")
+        return self._buffer[self._highs[self._high_start]]
+
 
 class MultiSparkline(displayio.TileGrid):
     """A multiple sparkline graph.
@@ -101,11 +162,20 @@ class MultiSparkline(displayio.TileGrid):
     :param int y: Y-position on the screen, in pixels
     :param list colors: Each line color. Number of items in this list determines maximum
                        number of sparklines
+    :param bool scroll: (Optional) Draw incrementally (False). Each add_values() call
+                       only draws the newest segment of each line, scrolling the bitmap
+                       left by one sample once the lines are full. The whole chart is
+                       only redrawn when an autoscaled range changes. Implies
+                       dyn_xpitch=False with a whole number of pixels per sample.
 
     Note: If dyn_xpitch is True (default), each sparkline will allways span
     the complete width. Otherwise, each sparkline will grow when you
     add values. Once the line has reached the full width, each sparkline
     will scroll to the left.
+
+    In scroll mode pass a value for every line on each add_values() call, so
+    that all lines scroll together. Where lines cross, the newest segment is
+    on top, rather than the line added last as in a full redraw.
     """
 
     # pylint: disable=too-many-arguments, too-many-instance-attributes
@@ -120,18 +190,26 @@ class MultiSparkline(displayio.TileGrid):
         y_maxs: Optional[List[Optional[int]]] = None,  # None = autoscaling
         x: int = 0,
         y: int = 0,
+        scroll: Optional[bool] = False,  # True = draw only the newest segment
     ) -> None:
         # define class instance variables
         self._max_items = max_items  # maximum number of items in the list
         self._lines = len(colors)
         self._buffers = [
-            _CyclicBuffer(self._max_items, 0.0) for i in range(self._lines)
+            _CyclicBuffer(self._max_items, 0.0, True) for i in range(self._lines)
         ]  # values per sparkline
         self._points = [
             _CyclicBuffer(self._max_items, (0, 0)) for i in range(self._lines)
         ]  # _points: all points of sparkline
+        self.scroll = scroll
+        if scroll:
+            dyn_xpitch = False
+            self._xpitch = (width - 1) // (self._max_items - 1)
+            if self._xpitch < 1:
+                raise ValueError("scroll needs max_items no larger than width")
+            self._last_ys = [0] * self._lines  # y of the newest point of each line
         self.dyn_xpitch = dyn_xpitch
-        if not dyn_xpitch:
+        if not dyn_xpitch and not scroll:
             self._xpitch = (width - 1) / (self._max_items - 1)
         self.y_mins = (
             [None] * self._lines if y_mins is None else y_mins
@@ -172,52 +250,104 @@ class MultiSparkline(displayio.TileGrid):
         call the update()-method
         """
 
+        rescaled = False
+        shifted = 0  # lines that had to drop their oldest value
+        added = 0
         for (i, value) in enumerate(values):
             if value is not None:
-                top = self.y_tops[i]
-                bottom = self.y_bottoms[i]
-                if (
-                    self._buffers[i].len() >= self._max_items
-                ):  # if list is full, remove the first item
-                    first = self._buffers[i].pop()
-                    # check if boundaries have to be updated
-                    if self.y_mins[i] is None and first == bottom:
-                        bottom = min(self._buffers[i].values())
-                    if self.y_maxs[i] is None and first == self.y_tops[i]:
-                        top = max(self._buffers[i].values())
-                self._buffers[i].push(value)
-
+                buffer = self._buffers[i]
+                if buffer.len() >= self._max_items:
+                    buffer.pop()  # if list is full, remove the first item
+                    shifted += 1
+                buffer.push(value)
+                added += 1
+
+                # boundaries only change when the buffer min/max does
                 if self.y_mins[i] is None:
-                    bottom = value if not bottom else min(value, bottom)
+                    bottom = buffer.min_value()
+                    if self.y_bottoms[i] != bottom:
+                        self.y_bottoms[i] = bottom
+                        rescaled = True
                 if self.y_maxs[i] is None:
-                    top = value if not top else max(value, top)
+                    top = buffer.max_value()
+                    if self.y_tops[i] != top:
+                        self.y_tops[i] = top
+                        rescaled = True
 
-                self.y_tops[i] = top
-                self.y_bottoms[i] = bottom
-
-                if update:
+                if update and not self.scroll:
                     self.update_line(i)
 
+        if update and self.scroll:
+            if rescaled or 0 < shifted < added:
+                self.update_line()  # scale changed or lines out of step
+            else:
+                if shifted:
+                    self._scroll()
+                for (i, value) in enumerate(values):
+                    if value is not None:
+                        self._draw_newest(i, value)
+
+    def _y_of(self, line: int, value: float) -> int:
+        # Guard for y_top and y_bottom being the same
+        top = self.y_tops[line]
+        bottom = self.y_bottoms[line]
+        if top == bottom:
+            return int(0.5 * self.height)
+        return int((self.height - 1) * (top - value) / (top - bottom))
+
     def _add_point(
         self,
         line: int,
         x: int,
         value: float,
     ) -> None:
-        # Guard for y_top and y_bottom being the same
-        top = self.y_tops[line]
-        bottom = self.y_bottoms[line]
-        if top == bottom:
-            y = int(0.5 * self.height)
-        else:
-            y = int((self.height - 1) * (top - value) / (top - bottom))
-        self._points[line].push((x, y))
+        self._points[line].push((x, self._y_of(line, value)))
 
     def _draw(self) -> None:
         self._bitmap.fill(0)
         for i in range(self._lines):
             Polygon.draw(self._bitmap, self._points[i].values(), i + 1, close=False)
 
+    def _draw_newest(self, line: int, value: float) -> None:
+        # draw the segment from the previous point to the new one
+        y = self._y_of(line, value)
+        n_points = self._buffers[line].len()
+        if n_points >= 2:
+            x = (n_points - 1) * self._xpitch
+            Polygon._line_on(
+                self._bitmap, (x - self._xpitch, self._last_ys[line]), (x, y), line + 1
+            )
+        self._last_ys[line] = y
+
+    def _scroll(self) -> None:
+        # move the chart left by one sample and clear the columns that opened up
+        bitmap = self._bitmap
+        pitch = self._xpitch
+        width = bitmap.width
+        height = bitmap.height
+        if hasattr(bitmap, "blit"):
+            # blit handles overlapping copies within one bitmap
+            bitmap.blit(0, 0, bitmap, x1=pitch, y1=0, x2=width, y2=height)
+        else:
+            for row in range(0, width * height, width):
+                for index in range(row, row + width - pitch):
+                    bitmap[index] = bitmap[index + pitch]
+        for column in range(width - pitch, width):
+            Polygon._span(bitmap, column, 0, column + 1, height, 0)
+
+        # column 0 still holds the end of the dropped segment, redraw it from the
+        # new first segment of each line
+        Polygon._span(bitmap, 0, 0, 1, height, 0)
+        for i in range(self._lines):
+            buffer = self._buffers[i]
+            if buffer.len() >= 2:
+                Polygon._line_on(
+                    bitmap,
+                    (0, self._y_of(i, buffer.at(0))),
+                    (pitch, self._y_of(i, buffer.at(1))),
+                    i + 1,
+                )
+
     def update_line(self, line: int = None) -> None:
         """Update the drawing of the sparkline.
         param int|None line: Line to update. Set to None for updating all (default).
@@ -232,6 +362,10 @@ class MultiSparkline(displayio.TileGrid):
         for a_line in lines:
             # bail out early if we only have a single point
             n_points = self._buffers[a_line].len()
+            if self.scroll and n_points:
+                self._last_ys[a_line] = self._y_of(
+                    a_line, self._buffers[a_line].at(n_points - 1)
+                )
             if n_points < 2:
                 continue
 
@@ -28,6 +28,11 @@ except ImportError:
 
 import displayio
 
+try:
+    from bitmaptools import fill_region
+except ImportError:
+    fill_region = None
+
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Display_Shapes.git"
 
@@ -112,17 +117,48 @@ class Polygon(displayio.TileGrid):
 
     # pylint: enable=too-many-arguments
 
+    # Cohen-Sutherland region codes of a point against the bitmap
+    _LEFT = 1
+    _RIGHT = 2
+    _TOP = 4
+    _BOTTOM = 8
+
     @staticmethod
-    def _safe_draw(
+    def _outcode(x: int, y: int, width: int, height: int) -> int:
+        code = 0
+        if x < 0:
+            code |= Polygon._LEFT
+        elif x >= width:
+            code |= Polygon._RIGHT
+        if y < 0:
+            code |= Polygon._TOP
+        elif y >= height:
+            code |= Polygon._BOTTOM
+        return code
+
+    @staticmethod
+    def _span(
         bitmap: displayio.Bitmap,
-        point: Tuple[int, int],
+        x_0: int,
+        y_0: int,
+        x_1: int,
+        y_1: int,
         color: int,
     ) -> None:
-        (x, y) = point
-        if 0 <= x < bitmap.width and 0 <= y < bitmap.height:
-            bitmap[x, y] = color
+        # fill the already clipped rectangle x_0..x_1-1, y_0..y_1-1 (one row or column)
+        if fill_region is not None:
+            fill_region(bitmap, x_0, y_0, x_1, y_1, color)
+            return
+        width = bitmap.width
+        if y_1 - y_0 == 1:
+            index = y_0 * width
+            for x in range(index + x_0, index + x_1):
+                bitmap[x] = color
+        else:
+            for index in range(y_0 * width + x_0, y_1 * width + x_0, width):
+                bitmap[index] = color
 
-    # pylint: disable=too-many-branches, too-many-locals
+    # pylint: disable=too-many-branches, too-many-locals, too-many-statements
     @staticmethod
     def _line_on(
         bitmap: displayio.Bitmap,
@@ -132,25 +168,36 @@ class Polygon(displayio.TileGrid):
     ) -> None:
         (x_0, y_0) = p_0
         (x_1, y_1) = p_1
+        width = bitmap.width
+        height = bitmap.height
 
-        def pt_on(x, y):
-            Polygon._safe_draw(bitmap, (x, y), color)
+        code_0 = Polygon._outcode(x_0, y_0, width, height)
+        code_1 = Polygon._outcode(x_1, y_1, width, height)
+        if code_0 & code_1:
+            return  # both ends beyond the same edge, nothing to draw
 
         if x_0 == x_1:
             if y_0 > y_1:
                 y_0, y_1 = y_1, y_0
-            for _h in range(y_0, y_1 + 1):
-                pt_on(x_0, _h)
+            y_0 = max(y_0, 0)
+            y_1 = min(y_1, height - 1)
+            if y_0 <= y_1:
+                Polygon._span(bitmap, x_0, y_0, x_0 + 1, y_1 + 1, color)
         elif y_0 == y_1:
             if x_0 > x_1:
                 x_0, x_1 = x_1, x_0
-            for _w in range(x_0, x_1 + 1):
-                pt_on(_w, y_0)
+            x_0 = max(x_0, 0)
+            x_1 = min(x_1, width - 1)
+            if x_0 <= x_1:
+                Polygon._span(bitmap, x_0, y_0, x_1 + 1, y_0 + 1, color)
         else:
             steep = abs(y_1 - y_0) > abs(x_1 - x_0)
             if steep:
                 x_0, y_0 = y_0, x_0
                 x_1, y_1 = y_1, x_1
+                major_size, minor_size = height, width
+            else:
+                major_size, minor_size = width, height
 
             if x_0 > x_1:
                 x_0, x_1 = x_1, x_0
@@ -159,24 +206,54 @@ class Polygon(displayio.TileGrid):
             d_x = x_1 - x_0
             d_y = abs(y_1 - y_0)
 
-            err = d_x / 2
-
             if y_0 < y_1:
                 ystep = 1
             else:
                 ystep = -1
 
-            for x in range(x_0, x_1 + 1):
-                if steep:
-                    pt_on(y_0, x)
+            # Bresenham with the error doubled to stay in integers. After k steps
+            # the minor axis has moved m(k) = ceil((2*d_y*k - d_x) / (2*d_x)) pixels,
+            # so the line is clipped by picking the first and last step on the
+            # bitmap instead of moving the endpoints, and every pixel drawn is the
+            # same as in the unclipped line.
+            first = max(0, -x_0)
+            last = min(d_x, major_size - 1 - x_0)
+            if code_0 | code_1:
+                if ystep == 1:
+                    m_first, m_last = -y_0, minor_size - 1 - y_0
                 else:
-                    pt_on(x, y_0)
-                err -= d_y
+                    m_first, m_last = y_0 - minor_size + 1, y_0
+                # first step where the minor axis has moved m pixels
+                first = max(first, d_x * (2 * m_first - 1) // (2 * d_y) + 1)
+                last = min(last, d_x * (2 * m_last + 1) // (2 * d_y))
+            if first > last:
+                return
+
+            m = -((d_x - 2 * d_y * first) // (2 * d_x))
+            err = d_x - 2 * d_y * first + 2 * d_x * m
+            x = x_0 + first
+            y = y_0 + ystep * m
+
+            # walk a flat bitmap index, no per-pixel bounds checks or calls
+            if steep:
+                index = x * width + y
+                major_stride = width
+                minor_stride = ystep
+            else:
+                index = y * width + x
+                major_stride = 1
+                minor_stride = ystep * width
+            two_d_x = 2 * d_x
+            two_d_y = 2 * d_y
+            for _ in range(last - first + 1):
+                bitmap[index] = color
+                index += major_stride
+                err -= two_d_y
                 if err < 0:
-                    y_0 += ystep
-                    err += d_x
+                    index += minor_stride
+                    err += two_d_x
 
-    # pylint: enable=too-many-branches, too-many-locals
+    # pylint: enable=too-many-branches, too-many-locals, too-many-statements
 
     @property
     def outline(self) -> Optional[int]:
@@ -56,6 +56,7 @@ class Sparkline(MultiSparkline):
     :param int x: X-position on the screen, in pixels
     :param int y: Y-position on the screen, in pixels
     :param int color: Line color, the default value is 0xFFFFFF (WHITE)
+    :param bool scroll: (Optional) Draw only the newest segment on each add_value() (False)
 
     Note: If dyn_xpitch is True (default), the sparkline will allways span
     the complete width. Otherwise, the sparkline will grow when you
@@ -75,9 +76,19 @@ class Sparkline(MultiSparkline):
         x: int = 0,
         y: int = 0,
         color: int = 0xFFFFFF,  # line color, default is WHITE
+        scroll: Optional[bool] = False,  # True = draw only the newest segment
     ) -> None:
         super().__init__(
-            width, height, max_items, [color], dyn_xpitch, [y_min], [y_max], x, y
+            width,
+            height,
+            max_items,
+            [color],
+            dyn_xpitch,
+            [y_min],
+            [y_max],
+            x,
+            y,
+            scroll,
         )
 
     # pylint: enable=too-many-arguments
@@ -489,9 +489,7 @@ class Label(LabelBase):
                 skip_index=skip_index,
             )
 
-        else:  # perform pixel by pixel copy of the bitmap
-
-            # Perform input checks
+        else:  # copy row by row, clipped once up front
 
             if x_2 is None:
                 x_2 = source_bitmap.width
@@ -504,35 +502,51 @@ class Label(LabelBase):
             if y_1 > y_2:
                 y_1, y_2 = y_2, y_1
 
-            # Ensure that x2 and y2 are within source bitmap size
+            # Clip the source rectangle to the source bitmap
+            x_1 = max(x_1, 0)
+            y_1 = max(y_1, 0)
             x_2 = min(x_2, source_bitmap.width)
             y_2 = min(y_2, source_bitmap.height)
 
-            for y_count in range(y_2 - y_1):
-                for x_count in range(x_2 - x_1):
-                    x_placement = x + x_count
-                    y_placement = y + y_count
-
-                    if (bitmap.width > x_placement >= 0) and (
-                        bitmap.height > y_placement >= 0
-                    ):  # ensure placement is within target bitmap
-
-                        # get the palette index from the source bitmap
-                        this_pixel_color = source_bitmap[
-                            y_1
-                            + (
-                                y_count * source_bitmap.width
-                            )  # Direct index into a bitmap array is speedier than [x,y] tuple
-                            + x_1
-                            + x_count
-                        ]
-
-                        if (skip_index is None) or (this_pixel_color != skip_index):
-                            bitmap[  # Direct index into a bitmap array is speedier than [x,y] tuple
-                                y_placement * bitmap.width + x_placement
-                            ] = this_pixel_color
-                    elif y_placement > bitmap.height:
-                        break
+            # Clip against the target bitmap, moving the source start by the same amount
+            if x < 0:
+                x_1 -= x
+                x = 0
+            if y < 0:
+                y_1 -= y
+                y = 0
+            x_2 = min(x_2, x_1 + bitmap.width - x)
+            y_2 = min(y_2, y_1 + bitmap.height - y)
+            if x_1 >= x_2 or y_1 >= y_2:
+                return  # nothing left to draw
+
+            # Direct index into a bitmap array is speedier than [x,y] tuple
+            source_width = source_bitmap.width
+            target_width = bitmap.width
+            row_length = x_2 - x_1
+            source_row = y_1 * source_width + x_1
+            target_row = y * target_width + x
+            for _ in range(y_2 - y_1):
+                if skip_index is None:
+                    for offset in range(row_length):
+                        bitmap[target_row + offset] = source_bitmap[source_row + offset]
+                else:
+                    # walk the row, copying each opaque span and jumping over skip_index runs
+                    offset = 0
+                    while offset < row_length:
+                        while (
+                            offset < row_length
+                            and source_bitmap[source_row + offset] == skip_index
+                        ):
+                            offset += 1
+                        while offset < row_length:
+                            this_pixel_color = source_bitmap[source_row + offset]
+                            if this_pixel_color == skip_index:
+                                break
+                            bitmap[target_row + offset] = this_pixel_color
+                            offset += 1
+                source_row += source_width
+                target_row += target_width
 
     def _set_line_spacing(self, new_line_spacing: float) -> None:
         if self._save_text:
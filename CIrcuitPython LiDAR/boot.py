@@ -0,0 +1,6 @@
+# Runs once before code.py/main.py when the pico powers up or resets.
+# Adds a second USB serial port next to the console, the host sees it as the next /dev/ttyACM.
+# main.py sends the binary telemetry frames (UART_SERIAL) on it, the console keeps the prints and REPL.
+import usb_cdc
+
+usb_cdc.enable(console=True, data=True)
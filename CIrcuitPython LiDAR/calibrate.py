@@ -0,0 +1,82 @@
+# Backlash calibration for the LiDAR servo, run it once from the REPL: import calibrate
+#
+# Stand a thin post in front of the scanner at TARGET_ANGLE, with nothing closer
+# within SPAN degrees either side. The post is swept slowly in both directions.
+# The angle where it shows up in each direction is compared with TARGET_ANGLE,
+# and the correction per direction is saved to settings.toml as
+# SERVO_OFFSET_FWD / SERVO_OFFSET_REV, in tenths of a degree because
+# settings.toml only holds strings and integers. SERVO picks the values up on
+# the next boot and angleAt() applies them, so both sweep directions give the
+# same angle for the same obstacle.
+#
+# CIRCUITPY is read-only to code unless boot.py remounts it writable. If saving
+# fails, the lines to add by hand are printed instead.
+import time
+from Lidar_Class import LIDAR
+from Servo_Class import SERVO
+
+TARGET_ANGLE = 90   # degrees, where the post really is
+SPAN = 20           # degrees swept either side of the target
+SWEEP_STEP = 0.5    # degrees per servo tick while calibrating
+SETTINGS = "/settings.toml"
+
+
+def find_target(lidar, servo, start, end):
+    # sweep start -> end and return the servo angle at the centre of the closest return
+    servo.moveToAngle(start)
+    time.sleep(0.5)
+    lidar.read_frames()     # throw away everything measured while getting into position
+    servo.planMove(end, int(abs(end - start) / SWEEP_STEP))
+    closest = 0
+    angle_sum = 0.0
+    hits = 0
+    while servo.tick():
+        time.sleep(servo.tick_period)
+        n = lidar.read_frames()
+        for i in range(n):
+            dist = lidar.frames[2*i]
+            angle = servo.angleAt(lidar.stamps[i], corrected=False)
+            if closest == 0 or dist < closest - 2:
+                closest = dist          # new closest object, restart the average
+                angle_sum = angle
+                hits = 1
+            elif dist <= closest + 2:
+                angle_sum += angle
+                hits += 1
+    if hits == 0:
+        return None
+    return angle_sum / hits
+
+
+def save_offsets(fwd, rev):
+    lines = []
+    try:
+        with open(SETTINGS) as f:
+            for line in f:
+                if not line.startswith("SERVO_OFFSET_"):
+                    lines.append(line.rstrip())
+    except OSError:
+        pass
+    lines.append("SERVO_OFFSET_FWD = {}".format(fwd))
+    lines.append("SERVO_OFFSET_REV = {}".format(rev))
+    try:
+        with open(SETTINGS, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        print("Saved to {}".format(SETTINGS))
+    except OSError:
+        print("CIRCUITPY is read-only, add these lines to settings.toml:")
+        print(lines[-2])
+        print(lines[-1])
+
+
+lidar = LIDAR()
+lidar.configure()
+servo = SERVO()
+
+forward = find_target(lidar, servo, TARGET_ANGLE - SPAN, TARGET_ANGLE + SPAN)
+reverse = find_target(lidar, servo, TARGET_ANGLE + SPAN, TARGET_ANGLE - SPAN)
+if forward is None or reverse is None:
+    print("No target found, check the post is inside the sweep")
+else:
+    print("Target seen at {:.1f} forward, {:.1f} reverse".format(forward, reverse))
+    save_offsets(int(round((TARGET_ANGLE - forward) * 10)), int(round((TARGET_ANGLE - reverse) * 10)))
@@ -1,12 +1,11 @@
-import board, busio, displayio, os
-import terminalio #Just a font
+import board, busio, displayio, os, usb_cdc
 import time
+import asyncio
 
 from adafruit_ssd1331 import SSD1331
-from adafruit_display_text import label
-from pixel import Pixel
 from Lidar_Class import LIDAR
 from Servo_Class import SERVO
+from Scanner_Class import SCANNER
 from Uart_Serial import UART_SERIAL
 
 displayio.release_displays()
@@ -21,61 +20,18 @@ display = SSD1331(display_bus, width=96, height=64)
 
 # Configure LiDAR
 lidar = LIDAR()
-lidar.set_samp_rate()
-lidar.save_settings()
+lidar.configure(rate=250, baud=460800)
 
 servo1 = SERVO()
 servo1.moveToAngle(0)
 
-#serial = UART_SERIAL()
+# Binary telemetry on the USB data port from boot.py, the second /dev/ttyACM of the pico on the host,
+# read there with read_pi_pico / SensorHub(binary=True). Pass it to SCANNER to send every frame
+# instead of printing distances on the console. UART_SERIAL() without a port uses GP8/GP9 instead.
+#usb_cdc.data.write_timeout = 0     # drop frames rather than stall the scan when the host is not reading
+#serial = UART_SERIAL(usb_cdc.data)
 
-# Make the display context
-splash = displayio.Group()
-display.show(splash)
-
-my_list =[]
-
-#pixel Array
-for x in range(0, 90, 1): #range(start, end, step)
-    pixel = Pixel(1, x+4, 45)
-    my_list.append(pixel)
-    splash.append(my_list[x].circle)
-
-text_area = label.Label(terminalio.FONT, text="Ang:{} Dist:{}".format(0,0), color=0xFFFFFF)
-
-# set label position on the display
-text_area.anchor_point = (0, 0)
-text_area.anchored_position = (1, 50)
-
-
-splash.append(text_area)
-ang = 0
-fw  = 1
-while True:
-    dist = lidar.getLidarDistance()
-    
-    if dist > 0:
-        text_area.text="Ang:{} Dist:{}".format(180 - ang,dist)
-        index = 90 - ((int)(ang/2)+1)
-        
-        print(dist)
-        #serial.message(dist)
-        
-        if dist < 100: #limit in cm
-            my_list[index].update(index,(49 - (int)(dist/10)), 0xFC0303) #Red
-        elif dist < 250:
-            my_list[index].update(index,(49 - (int)(dist/10)), 0xFCF403) #Yellow
-        else:
-            my_list[index].update(index,(49 - (int)(dist/10)), 0x03FC03) #Green     
-    #pass    
-        if fw == 1:
-            ang = ang + 2
-        else:
-            ang = ang - 2
-        if ang >= 180:
-            fw = 0
-            ang = 178
-        if ang <= 0 :
-            fw = 1
-            ang = 2
-        servo1.moveSmoothToAngle(ang)
+# Sensor reads, servo steps, display and serial output each run as their own task
+scanner = SCANNER(lidar, servo1, display)
+#scanner = SCANNER(lidar, servo1, display, serial)
+asyncio.run(scanner.run())
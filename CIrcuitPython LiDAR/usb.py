@@ -1,15 +1,112 @@
 # receiver.py / USB => USB
 import os
-from rusb import USB
-from _thread import start_new_thread
-from time import sleep_ms
+import sys
+import select
+from _thread import start_new_thread, allocate_lock
+from time import ticks_ms, ticks_add, ticks_diff
 
-usb = USB()
+POLL_MS = 20    # longest the reader thread sleeps on stdin, also the resolution of wait() timeouts
 
-input_msg = None
-bufferSTDINthread = start_new_thread(usb.bufferSTDIN, ())
 
+class COMMAND_RING:
+  # Lines from the reader thread to the main loop, without polling.
+  # Single producer (reader thread) / single consumer (main loop) ring: only the
+  # reader writes head and only the consumer writes tail, so neither needs a lock.
+  # Indices count modulo 2*size so a full ring and an empty one look different.
+  # The consumer sleeps in wait() on a lock used as a doorbell, the reader rings it
+  # after pushing a line, or once a wait() deadline passes (MicroPython locks have
+  # no acquire timeout).
+
+  def __init__(self, size=16):
+    self.size = size
+    self.slots = [None] * size
+    self.head = 0
+    self.tail = 0
+    self.overflows = 0      # lines dropped because the consumer fell behind
+    self.waiting = False
+    self.deadline = None
+    self.doorbell = allocate_lock()
+    self.doorbell.acquire()
+
+  def __len__(self):
+    return (self.head - self.tail) % (2 * self.size)
+
+  def push(self, item):
+    # reader thread only
+    if len(self) == self.size:
+      self.overflows += 1
+      return False
+    self.slots[self.head % self.size] = item
+    self.head = (self.head + 1) % (2 * self.size)
+    self.ring()
+    return True
+
+  def ring(self):
+    # wake the consumer if it is sleeping in wait()
+    if self.waiting:
+      self.waiting = False
+      try:
+        self.doorbell.release()
+      except RuntimeError:    # already rung
+        pass
+
+  def check_deadline(self):
+    # reader thread, ends a wait() whose timeout has passed
+    deadline = self.deadline
+    if self.waiting and deadline is not None and ticks_diff(ticks_ms(), deadline) >= 0:
+      self.ring()
+
+  def wait(self, timeout_ms=None):
+    # block until a line is queued, returns False if timeout_ms passed first
+    if timeout_ms is not None:
+      self.deadline = ticks_add(ticks_ms(), timeout_ms)
+    while len(self) == 0:
+      if timeout_ms is not None and ticks_diff(ticks_ms(), self.deadline) >= 0:
+        self.deadline = None
+        return False
+      self.waiting = True
+      if len(self):           # pushed before the reader could see waiting
+        self.waiting = False
+        break
+      self.doorbell.acquire()
+    self.deadline = None
+    return True
+
+  def get(self, timeout_ms=None):
+    # oldest queued line, or None on timeout
+    if not self.wait(timeout_ms):
+      return None
+    item = self.slots[self.tail % self.size]
+    self.slots[self.tail % self.size] = None
+    self.tail = (self.tail + 1) % (2 * self.size)
+    return item
+
+  def drain(self, out):
+    # move every queued line into the list out, returns how many
+    out.clear()
+    while len(self):
+      out.append(self.slots[self.tail % self.size])
+      self.slots[self.tail % self.size] = None
+      self.tail = (self.tail + 1) % (2 * self.size)
+    return len(out)
+
+
+def read_stdin(ring):
+  # reader thread, sleeps in poll() until a line starts to arrive
+  poller = select.poll()
+  poller.register(sys.stdin, select.POLLIN)
+  while True:
+    if poller.poll(POLL_MS):
+      ring.push(sys.stdin.readline())
+    ring.check_deadline()
+
+
+commands = COMMAND_RING()
+reader_thread = start_new_thread(read_stdin, (commands,))
+
+batch = []
 while True:
-  input_msg = usb.getLineBuffer()
-  print(input_msg)
-  sleep_ms(10)
+  commands.wait()             # sleeps until a command arrives
+  commands.drain(batch)       # everything that came in meanwhile, in one go
+  for input_msg in batch:
+    print(input_msg)
@@ -4,10 +4,11 @@ import argparse         # Lets us specify if we want to simulate or move drone
 import subprocess       # Run concurrent terminals for Shell to PX4 and mavsdk_server
 import asyncio          # Asyncio allows for near concurrent processing 
 import time
+import logging          # LIDAR link metrics are logged to lidar_link.log
 import drone_util       # Utilities to use on drone
 import flight_tests     # Flight paths and mission planning
 import tune_example     # Plays tune to show connection
-import read_pi_pico     # Lidar connection using rpi pico GPIO pinout
+import sensor_hub       # Lidar connections using rpi pico GPIO pinout, one per sensor
 
 from mavsdk import System   # Mavsdk system talks to the drone using serial port USB0/1 or ACM0/1
      
@@ -27,11 +28,10 @@ async def init_drone(sim):
 async def main(sim, LIDAR):
     ''' Initializes the drone, print coordinates & heading, then start a flight path '''
 
-    lidar_read, lidar_write = await LIDAR.run(port='/dev/ttyACM1')     # Instantiate serial connection to pico for lidar data
+    LIDAR.start()       # Serial connection to each pico, keeps every sensor's distance up to date
 
-    # while True:       # Continues to print lidar read distance
-    #     await asyncio.sleep(0.01);      d = await lidar_read.readline()
-    #     line = str(d[:-2], 'utf8');     print(line)
+    # while True:       # Continues to print the merged lidar distances
+    #     await asyncio.sleep(0.1);       print(LIDAR.obstacles())
 
     await init_drone(sim)
     print("\n\t:: Drone Initialized Ready for Flight ::\n")
@@ -46,7 +46,7 @@ async def main(sim, LIDAR):
     # await util.use_camera(drone)
 
     # await flights.takeoff(drone, util)    # - Default will fly 3 meters high, spin, and land
-    await flights.test_LIDAR(drone, util, lidar_read) # - Testing LIDAR, flys 1 meter up, moves until detects obj
+    await flights.test_LIDAR(drone, util, LIDAR['forward']) # - Testing LIDAR, flys 1 meter up, moves until detects obj
     print('past lidar testflight')
     # await flights.altitude_control(drone, util)
     # await flights.GPS_control(drone, util)
@@ -105,7 +105,11 @@ if __name__=="__main__":
     util = drone_util.util()
     flights = flight_tests.flights()
     tunes = tune_example.songs()
-    LIDAR = read_pi_pico.OutputProtocol()
+    logging.basicConfig(filename='lidar_link.log', level=logging.INFO, format='%(asctime)s %(message)s')
+    # Add a port per extra pico, e.g. 'left': '/dev/ttyACM2', 'right': '/dev/ttyACM3', 'down': '/dev/ttyACM4'
+    # The pico console prints text distances; for binary frames enable the serial in the pico's main.py,
+    # open its second port (the USB data port from boot.py, the next ttyACM) and pass binary=True
+    LIDAR = sensor_hub.SensorHub({'forward': '/dev/ttyACM1'})
     
     # Run the asyncio loop, if you need to quit the program press 'ctrl + c'
     asyncio.ensure_future(main(sim,LIDAR))
@@ -11,10 +11,39 @@ from mavsdk.offboard import (OffboardError, VelocityNedYaw) # GPS & Velocity Con
     # Mavsdk interacts with the drone through serial port USB0/1 or ACM0/1 
     # Mavsdk.offboard allows manual altitude/thrust/tilt/GPS
 
+LIDAR_MAX_AGE = 0.2     # seconds, an older reading is treated as an obstacle
+LIDAR_WAIT = 5          # seconds to wait for the first reading before giving up on moving
+
+def lidar_clear(lidar, limit=900):
+    # True only for a fresh reading further than limit cm, a missing or stale one means hold position
+    return lidar.latest is not None and lidar.age() <= LIDAR_MAX_AGE and lidar.distance > limit
+
+def lidar_lost(lidar):
+    # True when there is no reading or the newest one is older than LIDAR_MAX_AGE, nothing is known ahead
+    return lidar.latest is None or lidar.age() > LIDAR_MAX_AGE
+
+async def first_sample(lidar):
+    # Wait for the first reading, a dead link leaves lidar_clear() False so the drone stays put
+    try:
+        await asyncio.wait_for(lidar.next_sample(), LIDAR_WAIT)
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+
 class flights():
     def __init__(self):
         pass
 
+    # Without lidar data nothing may be flown, keep the last setpoint and come straight down
+    async def hold_and_land(self, drone, util, north):
+
+        print('-- LIDAR data missing or stale, holding position and landing')
+        await drone.offboard.set_position_ned(PositionNedYaw(north, 0.0, -1.0, util.heading))
+        await asyncio.sleep(2)
+
+        await util.stop_offboard(drone)
+        await util.land_drone(drone, util)
+        await asyncio.sleep(5)
+
     # Arm the drone if status check passed, generate path
     # Lift up and verify surroundings clear
     async def takeoff(self, drone, util):
@@ -45,7 +74,7 @@ class flights():
         await asyncio.sleep(5)
 
 
-    async def test_LIDAR(self, drone, util, lidar_read):
+    async def test_LIDAR(self, drone, util, lidar):
 
         print("-- Testing object avoidance using LIDAR to see obsticle")
 
@@ -61,21 +90,21 @@ class flights():
         await drone.offboard.set_position_ned(PositionNedYaw(0.0, 0.0, -1.0, util.heading))
         await asyncio.sleep(5)
 
-        i = 0.0;    d = await lidar_read.readline()
-        while i < 5:        # This is loop throws away the fist 5 responses from pi pico (settings & info)
-            _ = await lidar_read.readline()
-            i += 1
-
-        i = 0.0;    d = await lidar_read.readline();    line = str(d[:-2], 'utf8')
+        # lidar is a connected read_pi_pico.OutputProtocol, it parses the pico output as it
+        # arrives and skips the settings & info lines, so lidar.distance is always the newest reading
+        await first_sample(lidar)
+        i = 0.0
         print("< Go 0.01m  North every 0.01 seconds until LIDAR detects object >")
-        while ( (int(line) > 900) and ((i < 4)) ):   # Move until gone 4m or detect object 3ft away
+        while ( lidar_clear(lidar) and ((i < 4)) ):   # Move until gone 4m, detect object 3ft away or lose the lidar
             i += 0.015                         # Move 0.015m/0.01s = 1.5m/s
-            d = await lidar_read.readline()
-            line = str(d[:-2], 'utf8')
             await drone.offboard.set_position_ned(PositionNedYaw(i, 0.0, -1.0, util.heading))
-            print("-- North by {0}m : \tLidar {1}cm".format('%s' % float('%.4g' % i),line))
+            print("-- North by {0}m : \tLidar {1}cm".format('%s' % float('%.4g' % i),lidar.distance))
             await asyncio.sleep(0.01)      
 
+        if lidar_lost(lidar):
+            await self.hold_and_land(drone, util, i)
+            return
+
         # Now that loop has been escaped, move east 1.5m, north 1.5m, and move back 1.5m west (Should avoid obj in square movement)
         print('-- LIDAR detected object and stopped moving the drone')
         await asyncio.sleep(4)
@@ -100,7 +129,7 @@ class flights():
 
     # Arm the drone if status check passed, generate path
     # Lift up and verify surroundings clear
-    async def demo_flight(self, drone, util, lidar_read):
+    async def demo_flight(self, drone, util, lidar):
 
         print("-- Taking off")
         # await drone.action.set_takeoff_altitude(6)
@@ -118,28 +147,28 @@ class flights():
         await drone.offboard.set_position_ned(PositionNedYaw(0.0, 0.0, -1.0, util.heading))
         await asyncio.sleep(5)
 
-        i = 0.0;    d = await lidar_read.readline()
-        while i < 5:        # This is loop throws away the fist 5 responses from pi pico (settings & info)
-            _ = await lidar_read.readline()
-            i += 1
-
-        i = 0.0;    d = await lidar_read.readline();    line = str(d[:-2], 'utf8')
+        # lidar is a connected read_pi_pico.OutputProtocol, it parses the pico output as it
+        # arrives and skips the settings & info lines, so lidar.distance is always the newest reading
+        await first_sample(lidar)
+        i = 0.0
         print("< Go 0.015m  North every 0.01 seconds until LIDAR detects object >")
         while ( i < 4 ):   # Move until gone 4m or detect object 3ft away
-            while (int(line) > 900):
+            while lidar_clear(lidar):
                 i += 0.015                         # Move 0.015m/0.01s = 1.5m/s
-                d = await lidar_read.readline()
-                line = str(d[:-2], 'utf8')
                 await drone.offboard.set_position_ned(PositionNedYaw(i, 0.0, -1.0, util.heading))
-                print("-- North by {0}m : \tLidar {1}cm".format('%s' % float('%.4g' % i),line))
+                print("-- North by {0}m : \tLidar {1}cm".format('%s' % float('%.4g' % i),lidar.distance))
                 await asyncio.sleep(0.01)  
             break       # Remove break to continue reading lidar and moving drone
         
+            if lidar_lost(lidar):
+                break
             print('-- LIDAR detected object and stopped moving the drone')
-            await asyncio.sleep(4)
-            while (int(line) > 900):    # Begin further object avoidance here
-                pass
+            await asyncio.sleep(4)      # Begin further object avoidance here
         
+        if lidar_lost(lidar):
+            await self.hold_and_land(drone, util, i)
+            return
+
         # Now that loop has been escaped, move east 1.5m, north 1.5m, and move back 1.5m west (Should avoid obj in square movement)
         print('-- LIDAR detected object and stopped moving the drone')
         await asyncio.sleep(4)
@@ -3,25 +3,351 @@
 import serial
 import asyncio
 import serial_asyncio
+import struct
+import binascii
+import time
+import json
+import logging
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import deque, namedtuple
+
+# Binary telemetry frame sent by UART_SERIAL.sendFrame on the pico, little endian, 15 bytes:
+#   sync 0xA5 0x5A, seq u8, ticks_ms stamp u32, angle u16 (0.1 deg), distance u16 (cm),
+#   strength u16, CRC-16/CCITT-FALSE u16 of the 13 bytes before it
+SYNC = b'\xa5\x5a'
+FRAME = struct.Struct('<2sBIHHHH')
+CRC_OFFSET = 13
+TICKS_PERIOD = 1 << 29      # pico supervisor.ticks_ms wraps here
+
+Sample = namedtuple('Sample', ['seq', 'stamp', 'angle', 'distance', 'strength'])
+
+logger = logging.getLogger(__name__)
+
+
+class StreamDecoder(ABC):
+    ''' Holds received bytes in a preallocated buffer until whole frames can be parsed out '''
+    def __init__(self, size=4096):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.count = 0          # bytes in the buffer not parsed yet
+        self.skipped = 0        # bytes thrown away without being part of a frame
+        self.errors = 0         # frames or lines that failed to parse
+
+    def feed(self, data, emit):
+        ''' Add received bytes, calls emit(sample) for every complete Sample in them '''
+        size = len(self.buffer)
+        offset = 0
+        while offset < len(data):
+            take = min(len(data) - offset, size - self.count)
+            if take == 0:       # buffer full of something that never parsed, start again
+                self.skipped += self.count
+                self.count = 0
+                continue
+            self.view[self.count:self.count+take] = data[offset:offset+take]
+            self.count += take
+            offset += take
+            used = self.parse(emit)
+            if used:            # keep the partial frame at the end for the next chunk
+                self.view[:self.count-used] = self.view[used:self.count]    # overlapping copy, no new bytearray
+                self.count -= used
+
+    def reset(self):
+        ''' Forget buffered bytes, e.g. a partial line from a dropped connection, counters are kept '''
+        self.count = 0
+
+    @abstractmethod
+    def parse(self, emit):
+        ''' Parse whole frames from buffer[:count], returns the number of bytes used up '''
+
+
+class LineDecoder(StreamDecoder):
+    ''' Text distance lines, as printed by the pico without a telemetry UART '''
+    def parse(self, emit):
+        buf = self.buffer
+        i = 0
+        while True:
+            j = buf.find(b'\n', i, self.count)
+            if j < 0:
+                return i
+            try:
+                distance = int(buf[i:j])
+            except ValueError:      # settings & info lines the pico prints at start-up
+                self.skipped += j + 1 - i
+                self.errors += 1
+            else:
+                emit(Sample(None, None, None, distance, None))
+            i = j + 1
+
+
+class TelemetryDecoder(StreamDecoder):
+    ''' Binary telemetry frames, resyncing on the sync word and dropping bad CRCs '''
+    def __init__(self, size=4096):
+        super().__init__(size)
+        self.last_seq = None
+        self.frames = 0         # good frames
+        self.crc_errors = 0     # frames dropped for a bad CRC
+        self.dropped = 0        # frames missing from the sequence numbers
+
+    def reset(self):
+        super().reset()
+        self.last_seq = None    # a new connection starts a new sequence
+
+    def parse(self, emit):
+        buf = self.buffer
+        count = self.count
+        i = 0
+        while count - i >= FRAME.size:
+            if buf[i] != SYNC[0] or buf[i+1] != SYNC[1]:
+                j = buf.find(SYNC, i + 1, count)
+                if j < 0:
+                    j = count - 1       # keep a last byte that may start a sync word
+                self.skipped += j - i
+                i = j
+                continue
+            if binascii.crc_hqx(self.view[i:i+CRC_OFFSET], 0xFFFF) != buf[i+CRC_OFFSET] | buf[i+CRC_OFFSET+1] << 8:
+                self.crc_errors += 1
+                self.errors += 1
+                self.skipped += 1
+                i += 1          # not a frame after all, look for the next sync word
+                continue
+            _, seq, stamp, angle, distance, strength, _ = FRAME.unpack_from(buf, i)
+            if self.last_seq is not None:
+                self.dropped += (seq - self.last_seq - 1) & 0xFF
+            self.last_seq = seq
+            self.frames += 1
+            emit(Sample(seq, stamp, angle / 10, distance, strength))
+            i += FRAME.size
+        return i
+
+
+class Histogram:
+    ''' Counts of values per bucket, bucket i holds values <= bounds[i], the last one the rest '''
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def report(self):
+        labels = ['<=%g' % bound for bound in self.bounds] + ['>%g' % self.bounds[-1]]
+        return dict(zip(labels, self.counts))
+
+
+class LinkMetrics:
+    ''' Link quality of one pico connection over the current reporting interval:
+        samples/s, parse failures, inter-arrival jitter, samples decoded per received chunk
+        (how bursty the USB delivery is, not a backlog, only the newest sample is kept)
+        and sample age. The age at consumption is how old the newest sample was when the
+        flight logic read it. For binary frames the transit jitter is the host arrival
+        time minus the pico stamp, less the same difference for the fastest frame of the
+        interval. The two clocks have unrelated epochs, so it is not a latency, only how
+        much later than the quickest frame each one arrived. '''
+    INTERVAL_MS = (5, 10, 20, 30, 50, 100, 200, 500)
+    CHUNK = (1, 2, 4, 8, 16, 32, 64)
+    AGE_MS = (1, 2, 5, 10, 20, 50, 100, 200)
 
-class OutputProtocol(asyncio.Protocol):
     def __init__(self):
-        self.distance = 0
-        self.reader = None
-        self.writer = None
+        self.intervals = Histogram(self.INTERVAL_MS)
+        self.chunk = Histogram(self.CHUNK)
+        self.consumed_age = Histogram(self.AGE_MS)
+        self.transit_jitter = Histogram(self.AGE_MS)
+        self.last_time = None
+        self.decoder = None         # decoder the error and drop totals below were read from
+        self.last_errors = 0
+        self.last_dropped = 0
+        self.reset(time.monotonic())
+
+    def reset(self, now):
+        self.start = now
+        self.samples = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.max_pending = 0
+        self.interval_sum = 0.0
+        self.interval_squares = 0.0
+        self.intervals_seen = 0
+        self.offsets = []       # (host ms - pico stamp) of this interval's frames
+        for histogram in (self.intervals, self.chunk, self.consumed_age, self.transit_jitter):
+            histogram.reset()
+
+    def on_chunk(self, nbytes, samples, pending):
+        self.chunks += 1
+        self.bytes += nbytes
+        self.chunk.add(samples)
+        self.max_pending = max(self.max_pending, pending)
+
+    def on_sample(self, now, sample):
+        self.samples += 1
+        if self.last_time is not None:
+            interval = (now - self.last_time) * 1000
+            self.intervals.add(interval)
+            self.interval_sum += interval
+            self.interval_squares += interval * interval
+            self.intervals_seen += 1
+        self.last_time = now
+        if sample.stamp is not None:
+            self.offsets.append((int(now * 1000) - sample.stamp) % TICKS_PERIOD)
+
+    def on_consume(self, age):
+        self.consumed_age.add(age * 1000)
 
+    def report(self, decoder, now=None):
+        ''' Dict of the metrics since the last report, then starts a new interval '''
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self.start, 1e-6)
+        mean = jitter = 0.0
+        if self.intervals_seen:
+            mean = self.interval_sum / self.intervals_seen
+            jitter = max(self.interval_squares / self.intervals_seen - mean * mean, 0.0) ** 0.5
+        if self.offsets:
+            fastest = min(self.offsets)     # clock offset plus the shortest transit, not known apart
+            for offset in self.offsets:
+                self.transit_jitter.add(offset - fastest)
+        if decoder is not self.decoder:     # a new decoder counts from zero
+            self.decoder = decoder
+            self.last_errors = self.last_dropped = 0
+        dropped = getattr(decoder, 'dropped', 0)
+        result = {
+            'seconds': round(elapsed, 3),
+            'samples_per_s': round(self.samples / elapsed, 1),
+            'bytes_per_s': round(self.bytes / elapsed, 1),
+            'errors': decoder.errors - self.last_errors,
+            'dropped': dropped - self.last_dropped,
+            'interval_ms': round(mean, 2),
+            'jitter_ms': round(jitter, 2),
+            'interval_hist_ms': self.intervals.report(),
+            'chunk_hist': self.chunk.report(),
+            'max_pending_bytes': self.max_pending,
+            'consumed_age_hist_ms': self.consumed_age.report(),
+            'transit_jitter_hist_ms': self.transit_jitter.report(),
+        }
+        self.last_errors = decoder.errors
+        self.last_dropped = dropped
+        self.reset(now)
+        return result
 
-    async def run(self, port='/dev/ttyACM0'):
-        self.reader, self.writer = await serial_asyncio.open_serial_connection(url=port, baudrate=115200, parity=serial.PARITY_NONE, 
+
+class OutputProtocol(asyncio.Protocol):
+    ''' Serial protocol for the pico, received chunks are parsed straight from data_received
+        and each sample goes to the subscribers. Only the newest sample is kept, so a slow
+        control loop never reads old distances queued up behind it. '''
+    def __init__(self, history=32):
+        self.transport = None
+        self.decoder = LineDecoder()
+        self.latest = None          # newest Sample, None until the first one arrives
+        self.latest_time = 0.0      # time.monotonic() when it arrived
+        self.history = deque(maxlen=history)    # (arrival time, distance) of the newest samples, for distance_at()
+        self.samples = 0            # samples parsed since start
+        self.waiters = []           # futures of next_sample() calls
+        self.subscribers = []       # callbacks given every Sample
+        self.closed = None
+        self.metrics = LinkMetrics()
+
+
+    async def run(self, port='/dev/ttyACM0', binary=False):
+        ''' Open the pico serial port, binary for frames from UART_SERIAL.sendFrame '''
+        # the same decoder is kept across reconnects so its counters add up over the whole run
+        decoder_type = TelemetryDecoder if binary else LineDecoder
+        if type(self.decoder) is not decoder_type:
+            self.decoder = decoder_type()
+        loop = asyncio.get_running_loop()
+        self.closed = loop.create_future()
+        await serial_asyncio.create_serial_connection(loop, lambda: self, url=port, baudrate=115200, parity=serial.PARITY_NONE, 
                                                     stopbits=serial.STOPBITS_ONE, bytesize=serial.EIGHTBITS, timeout=1)
-        return self.reader, self.writer
+        return self
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.decoder.reset()
+        self.history.clear()        # never interpolate across the gap of a reconnect
 
-    async def main(self):
-        r, w = await self.run()
+    def data_received(self, data):
+        samples = self.samples
+        self.decoder.feed(data, self.publish)
+        self.metrics.on_chunk(len(data), self.samples - samples, self.decoder.count)
+
+    def connection_lost(self, exc):
+        self.transport = None
+        waiters, self.waiters = self.waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_exception(ConnectionError("pico serial connection lost"))
+        if self.closed is not None and not self.closed.done():
+            self.closed.set_result(exc)
+
+    def subscribe(self, callback):
+        ''' callback(sample) is called for every sample as it is parsed '''
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def publish(self, sample):
+        self.latest = sample
+        self.latest_time = time.monotonic()
+        self.samples += 1
+        self.history.append((self.latest_time, sample.distance))
+        self.metrics.on_sample(self.latest_time, sample)
+        for callback in self.subscribers:
+            callback(sample)
+        if self.waiters:
+            waiters, self.waiters = self.waiters, []
+            for future in waiters:
+                if not future.done():
+                    future.set_result(sample)
+
+    async def next_sample(self):
+        ''' Wait for the next sample to arrive '''
+        if self.closed is not None and self.closed.done():
+            raise ConnectionError("pico serial connection lost")
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        sample = await future
+        self.metrics.on_consume(self.age())
+        return sample
+
+    @property
+    def distance(self):
+        ''' Newest distance in cm, 0 before the first sample, each read is logged in the metrics '''
+        if self.latest is None:
+            return 0
+        self.metrics.on_consume(self.age())
+        return self.latest.distance
+
+    def distance_at(self, when):
+        ''' Distance in cm at time.monotonic() instant when, interpolated between the two samples
+            around it, None if when is outside the kept history; recorded in the metrics like distance '''
+        history = self.history
+        if not history or when > history[-1][0] or when < history[0][0]:
+            return None
+        self.metrics.on_consume(self.age())
+        after_time, after = history[-1]
+        for before_time, before in reversed(history):
+            if before_time <= when:
+                if after_time == before_time:
+                    return before
+                return before + (after - before) * (when - before_time) / (after_time - before_time)
+            after_time, after = before_time, before
+
+    def age(self):
+        ''' Seconds since the newest sample arrived '''
+        return time.monotonic() - self.latest_time
+
+    async def log_metrics(self, name, interval=10.0):
+        ''' Write the link metrics to the log as one JSON line every interval seconds '''
         while True:
-            d = await r.readline()
-            line = str(d[:-2], 'utf8')
-            print(line)
+            await asyncio.sleep(interval)
+            logger.info("%s %s", name, json.dumps(self.metrics.report(self.decoder)))
+
+    async def main(self, binary=False):
+        await self.run(binary=binary)
+        self.subscribe(print)
+        await self.closed
 
 if __name__=="__main__":
     connection = OutputProtocol()
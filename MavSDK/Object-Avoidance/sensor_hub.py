@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import asyncio          # Every sensor link runs in the same event loop as the flight logic
+import time
+from collections import namedtuple
+import read_pi_pico     # One pico LiDAR connection per sensor
+
+
+class SensorHub:
+    ''' Keeps several pico LiDAR sensors connected at once, each on its own serial port with its
+        own OutputProtocol (parser, newest samples), and merges their readings into one obstacle
+        vector taken at a single instant. Parsing happens in each port's data_received as bytes arrive, so reading the
+        vector never waits on a sensor and more sensors add no latency to the control loop. '''
+    def __init__(self, ports, binary=False, max_age=0.2, retry=1.0, metrics_interval=10.0):
+        # ports: {'forward': '/dev/ttyACM1', 'left': '/dev/ttyACM2', ...}, in vector order
+        self.ports = dict(ports)
+        self.binary = binary        # pico sending binary telemetry frames instead of text lines
+        self.max_age = max_age      # s, older readings count as missing in the vector
+        self.retry = retry          # s between attempts to (re)open a port
+        self.metrics_interval = metrics_interval    # s between link metrics log lines, None for none
+        self.sensors = {name: read_pi_pico.OutputProtocol() for name in self.ports}
+        self.connects = dict.fromkeys(self.ports, 0)    # successful port opens
+        self.failures = dict.fromkeys(self.ports, 0)    # failed port opens
+        self.Obstacles = namedtuple('Obstacles', ['time'] + list(self.ports))
+        self.Reading = namedtuple('Reading', ['distance', 'time'])
+        self.tasks = []
+
+    def __getitem__(self, name):
+        return self.sensors[name]
+
+    def start(self):
+        ''' Start one task per sensor that opens its port and reopens it if it drops '''
+        self.tasks = [asyncio.ensure_future(self.keep_connected(name)) for name in self.ports]
+        if self.metrics_interval:
+            self.tasks += [asyncio.ensure_future(self.sensors[name].log_metrics(name, self.metrics_interval))
+                           for name in self.ports]
+        return self.tasks
+
+    async def keep_connected(self, name):
+        sensor = self.sensors[name]
+        while True:
+            try:
+                await sensor.run(self.ports[name], self.binary)
+            except OSError as error:    # serial.SerialException is an OSError too
+                self.failures[name] += 1
+                print("-- {0} sensor on {1} failed to open: {2}".format(name, self.ports[name], error))
+                await asyncio.sleep(self.retry)
+                continue
+            self.connects[name] += 1
+            print("-- {0} sensor connected on {1}".format(name, self.ports[name]))
+            await sensor.closed
+            print("-- {0} sensor disconnected".format(name))
+            await asyncio.sleep(self.retry)
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        for sensor in self.sensors.values():
+            if sensor.transport is not None:
+                sensor.transport.close()
+
+    def obstacles(self):
+        ''' Every sensor's distance (cm) at one reference time, the newest instant all sensors with a
+            reading younger than max_age have data for. Each value is a Reading(distance, time), the
+            distance interpolated to that time and the time of the sensor's own newest sample; None
+            where a sensor has no fresh reading or its history does not reach back to the reference '''
+        now = time.monotonic()
+        fresh = [name for name in self.ports if self.sensors[name].latest is not None
+                 and now - self.sensors[name].latest_time <= self.max_age]
+        if not fresh:
+            return self.Obstacles(None, *[None] * len(self.ports))
+        reference = min(self.sensors[name].latest_time for name in fresh)
+        readings = []
+        for name in self.ports:
+            sensor = self.sensors[name]
+            distance = sensor.distance_at(reference) if name in fresh else None
+            readings.append(None if distance is None else self.Reading(distance, sensor.latest_time))
+        return self.Obstacles(reference, *readings)
+
+    def closest(self):
+        ''' (name, distance) of the nearest obstacle any sensor sees, or None '''
+        vector = self.obstacles()
+        nearest = None
+        for name in self.ports:
+            reading = getattr(vector, name)
+            if reading is not None and (nearest is None or reading.distance < nearest[1]):
+                nearest = (name, reading.distance)
+        return nearest
+
+    def health(self):
+        ''' Per sensor link state and counters '''
+        report = {}
+        for name in self.ports:
+            sensor = self.sensors[name]
+            decoder = sensor.decoder
+            report[name] = {
+                'connected': sensor.transport is not None,
+                'connects': self.connects[name],
+                'failures': self.failures[name],
+                'samples': sensor.samples,
+                'skipped': decoder.skipped,
+                'crc_errors': getattr(decoder, 'crc_errors', 0),
+                'dropped': getattr(decoder, 'dropped', 0),
+                'age': sensor.age() if sensor.latest is not None else None,
+            }
+        return report